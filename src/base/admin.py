@@ -1,20 +1,167 @@
+import uuid
+
 from django.contrib import admin
-from .models import Post, Comment
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import Post, Comment, Job
+from .object_cache import invalidate_comments, invalidate_posts
+from .rendering import rendered_fields
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids an exact `COUNT(*)` over very large tables.
+
+    For an unfiltered changelist on PostgreSQL the planner's row estimate (summed
+    over the partitions of a partitioned table) is used once it exceeds
+    `exact_count_threshold`; small tables, filtered querysets and other
+    databases keep the exact count. The default manager's own filter (posts
+    hiding soft-deleted rows) does not count as filtering; the estimate then
+    includes rows still waiting to be purged.
+    """
+    exact_count_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        unfiltered = queryset.model._default_manager.all().query.where
+        if queryset.query.where == unfiltered:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    # A partitioned parent has no rows of its own: sum its partitions
+                    cursor.execute(
+                        "SELECT CASE WHEN c.relkind = 'p' THEN ("
+                        "  SELECT coalesce(sum(greatest(p.reltuples, 0)), 0) FROM pg_inherits i"
+                        "  JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid"
+                        ") ELSE greatest(c.reltuples, 0) END::bigint "
+                        "FROM pg_class c WHERE c.relname = %s",
+                        [queryset.model._meta.db_table])
+                    row = cursor.fetchone()
+                if row and row[0] > self.exact_count_threshold:
+                    return row[0]
+        return super().count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """A list filter rendered as a text box rather than one link per value."""
+    template = 'admin/base/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        # A dummy lookup so the filter is always rendered
+        return ((None, None),)
+
+    def choices(self, changelist):
+        other_params = {
+            key: value for key, value in changelist.get_filters_params().items()
+            if key != self.parameter_name
+        }
+        yield {'get_query': other_params}
+
+
+class AuthorFilter(InputFilter):
+    title = 'author username'
+    parameter_name = 'author'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(author__username=self.value().strip())
+
+
+class PostIdFilter(InputFilter):
+    title = 'post ID'
+    parameter_name = 'post'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            try:
+                return queryset.filter(post_id=uuid.UUID(self.value().strip()))
+            except ValueError:
+                return queryset.none()
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    Base admin for tables with millions of rows: no full-table counts, and a
+    search term that is a UUID is matched against the primary key directly.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        try:
+            return queryset.filter(pk=uuid.UUID(search_term.strip())), False
+        except ValueError:
+            return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ScalableModelAdmin):
     list_display = ('id', 'title', 'author', 'created_at', 'updated_at')
-    search_fields = ('title', 'content', 'author__username')
-    list_filter = ('author', 'created_at', 'updated_at')
+    list_select_related = ('author',)
+    # Prefix and exact lookups only, so searches can use indexes
+    search_fields = ('title__startswith', 'author__username__exact')
+    list_filter = (AuthorFilter, 'created_at', 'updated_at')
+    autocomplete_fields = ('author',)
     ordering = ('-created_at',)
-    readonly_fields = ('id', 'created_at', 'updated_at')
+    readonly_fields = ('id', 'content_html', 'content_hash', 'created_at', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        # Keep the pre-rendered HTML in step with content, as the API does
+        if not change or 'content' in form.changed_data:
+            for field, value in rendered_fields(obj.content).items():
+                setattr(obj, field, value)
+        super().save_model(request, obj, form, change)
+        if change:
+            invalidate_posts([obj.pk])
+
+    def delete_model(self, request, obj):
+        # Deleting a post cascades to its comments, which may be cached too
+        post_id, comment_ids = obj.pk, list(obj.comments.values_list('id', flat=True))
+        super().delete_model(request, obj)
+        invalidate_posts([post_id])
+        invalidate_comments(comment_ids)
+
+    def delete_queryset(self, request, queryset):
+        post_ids = list(queryset.values_list('id', flat=True))
+        comment_ids = list(Comment.objects.filter(post_id__in=post_ids).values_list('id', flat=True))
+        super().delete_queryset(request, queryset)
+        invalidate_posts(post_ids)
+        invalidate_comments(comment_ids)
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableModelAdmin):
     list_display = ('id', 'post', 'author', 'created_at')
-    search_fields = ('post__title', 'author__username', 'text')
-    list_filter = ('post', 'author', 'created_at')
+    list_select_related = ('post', 'author')
+    # Prefix and exact lookups only, so searches can use indexes
+    search_fields = ('post__title__startswith', 'author__username__exact')
+    list_filter = (PostIdFilter, AuthorFilter, 'created_at')
+    autocomplete_fields = ('post', 'author')
     ordering = ('-created_at',)
     readonly_fields = ('id', 'created_at')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            invalidate_comments([obj.pk])
+
+    def delete_model(self, request, obj):
+        comment_id = obj.pk
+        super().delete_model(request, obj)
+        invalidate_comments([comment_id])
+
+    def delete_queryset(self, request, queryset):
+        comment_ids = list(queryset.values_list('id', flat=True))
+        super().delete_queryset(request, queryset)
+        invalidate_comments(comment_ids)
+
+
+@admin.register(Job)
+class JobAdmin(ScalableModelAdmin):
+    list_display = ('id', 'task', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+    readonly_fields = ('id', 'created_at', 'locked_at', 'last_error')
@@ -1,18 +1,32 @@
+import datetime
 import logging
 import uuid
-from typing import Optional
+from typing import Literal, Optional
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
 
 from ninja import FilterSchema, Query
 from ninja.pagination import paginate, PageNumberPagination
 from ninja_extra import api_controller, http_get, http_post, http_delete, http_generic, status, ControllerBase
-
-from .models import Post, Comment
+from ninja_jwt.authentication import AsyncJWTAuth
+
+from . import trending
+from .broadcast import HubFull, event_stream, get_hub
+from .jobs import enqueue
+from .models import Post, Comment, TrendingScore
+from .object_cache import comment_key, fetch_many, invalidate_comments, invalidate_posts, post_key
+from .rendering import rendered_fields
 from .schemas import (
-    ErrorSchema, PostCreateSchema, PostUpdateSchema, PostDetailSchema,
-    CommentCreateSchema, CommentUpdateSchema, CommentDetailSchema, SuccessSchema
+    ErrorSchema, PostCreateSchema, PostUpdateSchema, PostDetailSchema, PostBatchSchema, PostPageSchema,
+    TrendingPageSchema,
+    CommentCreateSchema, CommentUpdateSchema, CommentDetailSchema, CommentBatchSchema, CommentPageSchema,
+    SuccessSchema
 )
 
 # Initialize logger
@@ -21,6 +35,105 @@ logger = logging.getLogger('BlogApi')
 # Get the User model
 User = get_user_model()
 
+UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _etag(instance):
+    """Strong ETag for a post or comment, derived from its `updated_at` version."""
+    return f'"{instance.updated_at.isoformat()}"'
+
+
+def _etag_matches(if_match, instance):
+    """Evaluate an `If-Match` header against the current version; absent means no precondition."""
+    if not if_match:
+        return True
+    # The tag names the stored version, so the W/ added by response compression is ignored
+    etags = [etag.removeprefix('W/') for etag in parse_etags(if_match)]
+    return '*' in etags or _etag(instance) in etags
+
+
+def _with_content(query, html):
+    """Load only the content column that will be served: Markdown or pre-rendered HTML."""
+    return query.defer('content') if html else query.defer('content_html')
+
+
+def _parse_ids(ids):
+    """
+    Parse a comma-separated list of UUIDs, dropping duplicates but keeping the order.
+
+    Raises:
+        ValueError: If an ID is malformed, or there are none or too many.
+    """
+    parsed = []
+    for value in ids.split(','):
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            parsed.append(uuid.UUID(value))
+        except ValueError:
+            raise ValueError(f"Invalid ID: {value}")
+    parsed = list(dict.fromkeys(parsed))
+    limit = settings.OBJECT_CACHE['MAX_BATCH_IDS']
+    if not parsed:
+        raise ValueError("No IDs given.")
+    if len(parsed) > limit:
+        raise ValueError(f"At most {limit} IDs per request.")
+    return parsed
+
+
+def _keyset_page(query, after, limit):
+    """
+    Fetch one page of `query` in primary-key order, starting after the `after` key.
+
+    Each page is an index range scan (`id > after ORDER BY id LIMIT n`), so deep
+    pages cost the same as the first and no COUNT is needed. With UUIDv7 keys
+    this is creation order; rows keyed before v7 sort by their random v4 key.
+
+    Returns:
+        tuple: The rows of the page and the cursor for the next page (None on the last).
+    """
+    if after is not None:
+        query = query.filter(pk__gt=after)
+    rows = list(query.order_by('pk')[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].pk
+    return rows, None
+
+
+def _trending_cursor(row, epoch):
+    """
+    Cursor naming a trending row's position: its score (`repr` round-trips
+    exactly), the epoch in microseconds that the score is relative to, and
+    the post ID.
+    """
+    micros = (epoch - UNIX_EPOCH) // datetime.timedelta(microseconds=1)
+    return f"{row.score!r}_{micros}_{row.post_id}"
+
+
+def _parse_trending_cursor(after):
+    """
+    Decode a trending cursor into a score relative to the current epoch and a
+    post ID, so it stays valid across a renormalization.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        score, micros, post_id = after.split('_')
+        epoch = UNIX_EPOCH + datetime.timedelta(microseconds=int(micros))
+    except OverflowError as e:
+        raise ValueError(str(e))
+    return trending.rescale(float(score), epoch), uuid.UUID(post_id)
+
+
+def _batch(ids, found):
+    """Order the found objects as requested and list the IDs that were not found."""
+    return {
+        'items': [found[object_id] for object_id in ids if object_id in found],
+        'missing': [object_id for object_id in ids if object_id not in found],
+    }
+
 
 @api_controller('/posts')
 class PostController(ControllerBase):
@@ -41,11 +154,12 @@ class PostController(ControllerBase):
         try:
             user = request.user  # Authenticated User instance
             new_post = Post.objects.create(
-                id=uuid.uuid4(),
                 title=post.title,
                 content=post.content,
-                author=user
+                author=user,
+                **rendered_fields(post.content)
             )
+            enqueue('post_saved', post_id=str(new_post.id), created=True)
             logger.info(f"Post created by {user.username}: {new_post.id}")
             return PostDetailSchema.from_orm(new_post)
         except Exception as e:
@@ -53,27 +167,55 @@ class PostController(ControllerBase):
             return {"error": "Failed to create post."}
 
     @http_generic('/{uuid:post_id}', methods=['put', 'patch'], response=PostDetailSchema)
-    def update_post(self, post_id: uuid.UUID, post: PostUpdateSchema):
+    def update_post(self, request, post_id: uuid.UUID, post: PostUpdateSchema):
         """
         Update an existing blog post.
 
+        Only the provided fields are written, in one UPDATE. When the request
+        carries an `If-Match` header with the post's ETag, the UPDATE is
+        conditional on that version and a concurrent change returns 412.
+
         Args:
+            request: The request object, optionally with an `If-Match` header.
             post_id: The UUID of the post to update.
             post: PostUpdateSchema object with the fields to be updated.
 
         Returns:
-            PostDetailSchema: The updated post details.
+            PostDetailSchema: The updated post details, with the new ETag header.
         """
         try:
-            existing_post = Post.objects.get(id=post_id)
-            for attr, value in post.dict(exclude_unset=True).items():
+            changes = post.dict(exclude_unset=True)
+            query = Post.objects.select_related('author').defer('content_html')
+            if 'content' in changes:
+                # The new value is in the request, no need to read the old one
+                query = query.defer('content')
+                changes.update(rendered_fields(changes['content']))
+            existing_post = query.get(id=post_id)
+            if_match = request.headers.get('If-Match')
+            if not _etag_matches(if_match, existing_post):
+                logger.warning(f"Precondition failed updating post {post_id}.")
+                return self.create_response(
+                    {"error": "Post has been modified."}, status_code=status.HTTP_412_PRECONDITION_FAILED)
+
+            changes['updated_at'] = timezone.now()
+            conditions = {'id': post_id}
+            if if_match:
+                conditions['updated_at'] = existing_post.updated_at
+            if not Post.objects.filter(**conditions).update(**changes):
+                logger.warning(f"Post {post_id} changed concurrently, update rejected.")
+                return self.create_response(
+                    {"error": "Post has been modified."}, status_code=status.HTTP_412_PRECONDITION_FAILED)
+
+            invalidate_posts([post_id])
+            for attr, value in changes.items():
                 setattr(existing_post, attr, value)
-            existing_post.save()
+            enqueue('post_saved', post_id=str(existing_post.id), created=False)
             logger.info(f"Post updated: {existing_post.id}")
+            self.context.response.headers['ETag'] = _etag(existing_post)
             return PostDetailSchema.from_orm(existing_post)
         except Post.DoesNotExist:
             logger.warning(f"Post with ID {post_id} not found for update.")
-            return {"error": "Post not found."}
+            return self.create_response({"error": "Post not found."}, status_code=404)
         except Exception as e:
             logger.error(f"Error updating post {post_id}: {str(e)}")
             return {"error": "Failed to update post."}
@@ -83,6 +225,11 @@ class PostController(ControllerBase):
         """
         Delete a blog post.
 
+        The post is flagged as deleted in a single UPDATE, which hides it from
+        every endpoint immediately. The post and its comments are then removed
+        by the `purge_post` background job in bounded batches, so a post with a
+        very large thread never holds a long transaction or loads its comments.
+
         Args:
             post_id: The UUID of the post to delete.
 
@@ -90,15 +237,15 @@ class PostController(ControllerBase):
             HTTP 204 No Content response on successful deletion, or an error response if deletion fails.
         """
         try:
-            post = Post.objects.get(id=post_id)
-            post.delete()
+            if not Post.objects.filter(id=post_id).update(is_deleted=True):
+                logger.warning(f"Post with ID {post_id} not found for deletion.")
+                # 404 Not Found: Error message
+                return self.create_response("Post not found.", status_code=404)
+            invalidate_posts([post_id])
+            enqueue('purge_post', post_id=str(post_id))
             logger.info(f"Post deleted: {post_id}")
             # 204 No Content: Success message (optional body)
             return self.create_response("Post deleted successfully.", status_code=status.HTTP_204_NO_CONTENT)
-        except Post.DoesNotExist:
-            logger.warning(f"Post with ID {post_id} not found for deletion.")
-            # 404 Not Found: Error message
-            return self.create_response("Post not found.", status_code=404)
         except Exception as e:
             logger.error(f"Error deleting post {post_id}: {str(e)}")
             # 500 Internal Server Error: Error message
@@ -106,28 +253,134 @@ class PostController(ControllerBase):
 
     @ http_get("", response=list[PostDetailSchema])
     @ paginate(PageNumberPagination, page_size=10)
-    def list_posts(self):
-        query = Post.objects.all()
-        return [PostDetailSchema.from_orm(post) for post in query]
+    def list_posts(self, format: Literal['markdown', 'html'] = 'markdown'):
+        """
+        List blog posts, with pagination.
+
+        Args:
+            format: `html` returns the content rendered at write time instead of Markdown.
+
+        Returns:
+            List[PostDetailSchema]: A paginated list of posts.
+        """
+        html = format == 'html'
+        query = _with_content(Post.objects.select_related('author'), html)
+        return [PostDetailSchema.from_orm(post, html=html) for post in query]
+
+    @http_get('/cursor', response=PostPageSchema)
+    def list_posts_by_cursor(self, after: Optional[uuid.UUID] = None, limit: int = 10,
+                             format: Literal['markdown', 'html'] = 'markdown'):
+        """
+        List blog posts oldest first with keyset pagination on the post ID.
+
+        Args:
+            after: The `next` cursor of the previous page; omit for the first page.
+            limit: Number of posts to return (at most 100).
+            format: `html` returns the content rendered at write time instead of Markdown.
+
+        Returns:
+            PostPageSchema: The page of posts and the cursor for the next one.
+        """
+        limit = max(1, min(limit, 100))
+        html = format == 'html'
+        posts, cursor = _keyset_page(
+            _with_content(Post.objects.select_related('author'), html), after, limit)
+        logger.info(f"Posts requested after cursor {after}")
+        return {'items': [PostDetailSchema.from_orm(post, html=html) for post in posts], 'next': cursor}
+
+    @http_get('/trending', response={200: TrendingPageSchema, 400: ErrorSchema})
+    def list_trending_posts(self, after: Optional[str] = None, limit: int = 10,
+                            format: Literal['markdown', 'html'] = 'markdown'):
+        """
+        List posts ranked by recent comment activity, with exponential time decay.
+
+        Reads the precomputed `TrendingScore` table through its score index with
+        keyset pagination on (score, post ID), so every page costs the same as
+        the first and no total count is returned. Scores keep moving between
+        requests, so a post can move across a page boundary, but a cursor
+        stays valid across renormalizations.
+
+        Args:
+            after: The `next` cursor of the previous page; omit for the first page.
+            limit: Number of posts to return (at most 50).
+            format: `html` returns the content rendered at write time instead of Markdown.
+
+        Returns:
+            TrendingPageSchema: The page of trending posts and the cursor for the next one.
+        """
+        limit = max(1, min(limit, 50))
+        html = format == 'html'
+        scores = (TrendingScore.objects.filter(post__is_deleted=False)
+                  .select_related('post__author')
+                  .defer('post__content' if html else 'post__content_html'))
+        if after is not None:
+            try:
+                score, post_id = _parse_trending_cursor(after)
+            except ValueError:
+                return self.create_response({"error": "Invalid cursor."}, status_code=400)
+            # The plain upper bound keeps the score index usable for the OR below
+            scores = scores.filter(Q(score__lt=score) | Q(score=score, post_id__gt=post_id),
+                                   score__lte=score)
+        rows = list(scores.order_by('-score', 'post_id')[:limit + 1])
+        cursor = _trending_cursor(rows[limit - 1], trending.get_epoch()) if len(rows) > limit else None
+        logger.info(f"Trending posts requested after cursor {after}")
+        return {'items': [PostDetailSchema.from_orm(row.post, html=html) for row in rows[:limit]],
+                'next': cursor}
+
+    @http_get('/batch', response=PostBatchSchema)
+    def get_posts_by_ids(self, ids: str, format: Literal['markdown', 'html'] = 'markdown'):
+        """
+        Retrieve several blog posts by ID in one request.
+
+        Cached posts are read with one `get_many`; the rest are loaded in one
+        query with their authors joined.
+
+        Args:
+            ids: Comma-separated post UUIDs (at most `OBJECT_CACHE['MAX_BATCH_IDS']`).
+            format: `html` returns the content rendered at write time instead of Markdown.
+
+        Returns:
+            PostBatchSchema: The posts in the requested order and the IDs not found.
+        """
+        try:
+            post_ids = _parse_ids(ids)
+        except ValueError as e:
+            return self.create_response({"error": str(e)}, status_code=400)
+        html = format == 'html'
+
+        def load(missing):
+            posts = _with_content(Post.objects.select_related('author'), html).filter(id__in=missing)
+            return {post.id: PostDetailSchema.from_orm(post, html=html).dict() for post in posts}
+
+        try:
+            found = fetch_many(post_ids, lambda post_id: post_key(post_id, format), load)
+            logger.info(f"Post batch requested: {len(found)} of {len(post_ids)} found")
+            return _batch(post_ids, found)
+        except Exception as e:
+            logger.error(f"Error retrieving post batch: {str(e)}")
+            return self.create_response({"error": "Failed to retrieve posts."}, status_code=500)
 
     @ http_get('/{uuid:post_id}', response=PostDetailSchema)
-    def get_post_by_id(self, post_id: uuid.UUID):
+    def get_post_by_id(self, post_id: uuid.UUID, format: Literal['markdown', 'html'] = 'markdown'):
         """
         Retrieve details of a specific blog post.
 
         Args:
             post_id: The UUID of the post to retrieve.
+            format: `html` returns the content rendered at write time instead of Markdown.
 
         Returns:
             PostDetailSchema: The details of the requested post.
         """
         try:
-            post = Post.objects.get(id=post_id)
+            html = format == 'html'
+            post = _with_content(Post.objects.select_related('author'), html).get(id=post_id)
             logger.info(f"Post retrieved: {post.id}")
-            return PostDetailSchema.from_orm(post)
+            self.context.response.headers['ETag'] = _etag(post)
+            return PostDetailSchema.from_orm(post, html=html)
         except Post.DoesNotExist:
             logger.warning(f"Post with ID {post_id} not found.")
-            return {"error": "Post not found."}
+            return self.create_response({"error": "Post not found."}, status_code=404)
         except Exception as e:
             logger.error(f"Error retrieving post {post_id}: {str(e)}")
             return {"error": "Failed to retrieve post."}
@@ -150,42 +403,76 @@ class CommentController(ControllerBase):
             CommentDetailSchema: The newly created comment details with the author's name.
         """
         try:
+            if not Post.objects.filter(id=comment.post).exists():
+                logger.warning(f"Post with ID {comment.post} not found for new comment.")
+                return self.create_response({"error": "Post not found."}, status_code=404)
             new_comment = Comment.objects.create(
-                id=uuid.uuid4(),
                 post_id=comment.post,
                 author=request.user,  # Use the authenticated user as the author
                 text=comment.text
             )
             logger.info(
                 f"Comment created: {new_comment.id} for post {comment.post}")
-            return CommentDetailSchema.from_orm(new_comment)
+            detail = CommentDetailSchema.from_orm(new_comment)
+            # Push to live streams only once the row is visible to readers
+            message = {'event': 'comment', 'id': str(detail.id), 'data': detail.model_dump_json()}
+            transaction.on_commit(
+                lambda: get_hub().publish(str(comment.post), message))
+            enqueue('comment_created', comment_id=str(new_comment.id), post_id=str(comment.post),
+                    created_at=new_comment.created_at.isoformat())
+            return detail
         except Exception as e:
             logger.error(f"Error creating comment: {str(e)}")
             return {"error": "Failed to create comment."}
 
     @http_generic('/{uuid:comment_id}', methods=['put', 'patch'], response=CommentDetailSchema)
-    def update_comment(self, comment_id: uuid.UUID, comment: CommentUpdateSchema):
+    def update_comment(self, request, comment_id: uuid.UUID, comment: CommentUpdateSchema):
         """
         Update an existing comment.
 
+        Only the provided fields are written, in one UPDATE. When the request
+        carries an `If-Match` header with the comment's ETag, the UPDATE is
+        conditional on that version and a concurrent change returns 412.
+
         Args:
+            request: The request object, optionally with an `If-Match` header.
             comment_id: The UUID of the comment to update.
             comment: CommentUpdateSchema object with the text to be updated.
 
         Returns:
-            CommentDetailSchema: The updated comment details.
+            CommentDetailSchema: The updated comment details, with the new ETag header.
         """
         try:
-            existing_comment = Comment.objects.get(id=comment_id)
-            for attr, value in comment.dict(exclude_unset=True).items():
+            changes = comment.dict(exclude_unset=True)
+            query = Comment.objects.select_related('author')
+            if 'text' in changes:
+                query = query.defer('text')
+            existing_comment = query.get(id=comment_id, post__is_deleted=False)
+            if_match = request.headers.get('If-Match')
+            if not _etag_matches(if_match, existing_comment):
+                logger.warning(f"Precondition failed updating comment {comment_id}.")
+                return self.create_response(
+                    {"error": "Comment has been modified."}, status_code=status.HTTP_412_PRECONDITION_FAILED)
+
+            changes['updated_at'] = timezone.now()
+            conditions = {'id': comment_id}
+            if if_match:
+                conditions['updated_at'] = existing_comment.updated_at
+            if not Comment.objects.filter(**conditions).update(**changes):
+                logger.warning(f"Comment {comment_id} changed concurrently, update rejected.")
+                return self.create_response(
+                    {"error": "Comment has been modified."}, status_code=status.HTTP_412_PRECONDITION_FAILED)
+
+            invalidate_comments([comment_id])
+            for attr, value in changes.items():
                 setattr(existing_comment, attr, value)
-            existing_comment.save()
             logger.info(f"Comment updated: {existing_comment.id}")
+            self.context.response.headers['ETag'] = _etag(existing_comment)
             return CommentDetailSchema.from_orm(existing_comment)
         except Comment.DoesNotExist:
             logger.warning(
                 f"Comment with ID {comment_id} not found for update.")
-            return {"error": "Comment not found."}
+            return self.create_response({"error": "Comment not found."}, status_code=404)
         except Exception as e:
             logger.error(f"Error updating comment {comment_id}: {str(e)}")
             return {"error": "Failed to update comment."}
@@ -202,8 +489,9 @@ class CommentController(ControllerBase):
             HTTP 204 No Content response on successful deletion, or an error response if deletion fails.
         """
         try:
-            comment = Comment.objects.get(id=comment_id)
+            comment = Comment.objects.get(id=comment_id, post__is_deleted=False)
             comment.delete()
+            invalidate_comments([comment_id])
             logger.info(f"Comment deleted: {comment_id}")
             return self.create_response(None, status_code=status.HTTP_204_NO_CONTENT)
         except Comment.DoesNotExist:
@@ -216,18 +504,24 @@ class CommentController(ControllerBase):
 
     @http_get('/post/{uuid:post_id}', response=list[CommentDetailSchema])
     @paginate(PageNumberPagination, page_size=10)
-    def get_comments_by_post(self, post_id: uuid.UUID):
+    def get_comments_by_post(self, post_id: uuid.UUID, recent_days: Optional[int] = None):
         """
         Retrieve all comments for a specific blog post, with pagination.
 
         Args:
             post_id: The UUID of the post whose comments are to be retrieved.
+            recent_days: Only return comments from the last N days (optional). On a
+                partitioned comment table this lets PostgreSQL skip older partitions.
 
         Returns:
             List[CommentDetailSchema]: A paginated list of comments for the specified post.
         """
         try:
-            comments = Comment.objects.filter(post_id=post_id)
+            comments = Comment.objects.filter(
+                post_id=post_id, post__is_deleted=False).select_related('author')
+            if recent_days is not None:
+                comments = comments.filter(
+                    created_at__gte=timezone.now() - datetime.timedelta(days=recent_days))
             logger.info(f"Comments requested for post: {post_id}")
             return [CommentDetailSchema.from_orm(comment) for comment in comments]
         except Exception as e:
@@ -235,6 +529,96 @@ class CommentController(ControllerBase):
                 f"Error retrieving comments for post {post_id}: {str(e)}")
             return {"error": "Failed to retrieve comments."}
 
+    @http_get('/post/{uuid:post_id}/cursor', response=CommentPageSchema)
+    def get_comments_by_post_cursor(self, post_id: uuid.UUID, after: Optional[uuid.UUID] = None,
+                                    limit: int = 10):
+        """
+        Retrieve a post's comments oldest first with keyset pagination on the comment ID.
+
+        Pages are served by the (post, id) index however deep the thread is.
+        Passing the ID of the last comment seen returns only newer comments,
+        e.g. to catch up after a comment stream `resync` event.
+
+        Args:
+            post_id: The UUID of the post whose comments are to be retrieved.
+            after: The `next` cursor of the previous page, or a comment ID; omit for the first page.
+            limit: Number of comments to return (at most 100).
+
+        Returns:
+            CommentPageSchema: The page of comments and the cursor for the next one.
+        """
+        limit = max(1, min(limit, 100))
+        comments, cursor = _keyset_page(
+            Comment.objects.filter(post_id=post_id, post__is_deleted=False).select_related('author'),
+            after, limit)
+        logger.info(f"Comments requested for post {post_id} after cursor {after}")
+        return {'items': [CommentDetailSchema.from_orm(comment) for comment in comments], 'next': cursor}
+
+    @http_get('/post/{uuid:post_id}/stream', auth=AsyncJWTAuth())
+    async def stream_comments_by_post(self, request, post_id: uuid.UUID):
+        """
+        Stream new comments for a blog post as Server-Sent Events.
+
+        Requires the ASGI application. Each open stream holds one slot of the
+        per-worker connection cap; when the cap is reached a 503 is returned.
+
+        Args:
+            request: The request object containing user information.
+            post_id: The UUID of the post whose new comments are streamed.
+
+        Returns:
+            StreamingHttpResponse: A `text/event-stream` of `comment` events.
+        """
+        try:
+            subscription = await get_hub().subscribe(str(post_id))
+        except HubFull:
+            logger.warning(f"Comment stream rejected for post {post_id}: connection cap reached.")
+            response = self.create_response(
+                {"error": "Too many open streams."}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '5'
+            return response
+        logger.info(f"Comment stream opened for post: {post_id}")
+        response = StreamingHttpResponse(
+            event_stream(subscription, settings.COMMENT_STREAM['KEEPALIVE_SECONDS']),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @http_get('/batch', response=CommentBatchSchema)
+    def get_comments_by_ids(self, ids: str):
+        """
+        Retrieve several comments by ID in one request.
+
+        Cached comments are read with one `get_many`; the rest are loaded in
+        one query with their authors joined. Comments on deleted posts are
+        reported as missing.
+
+        Args:
+            ids: Comma-separated comment UUIDs (at most `OBJECT_CACHE['MAX_BATCH_IDS']`).
+
+        Returns:
+            CommentBatchSchema: The comments in the requested order and the IDs not found.
+        """
+        try:
+            comment_ids = _parse_ids(ids)
+        except ValueError as e:
+            return self.create_response({"error": str(e)}, status_code=400)
+
+        def load(missing):
+            comments = Comment.objects.filter(
+                id__in=missing, post__is_deleted=False).select_related('author')
+            return {comment.id: CommentDetailSchema.from_orm(comment).dict() for comment in comments}
+
+        try:
+            found = fetch_many(comment_ids, comment_key, load)
+            logger.info(f"Comment batch requested: {len(found)} of {len(comment_ids)} found")
+            return _batch(comment_ids, found)
+        except Exception as e:
+            logger.error(f"Error retrieving comment batch: {str(e)}")
+            return self.create_response({"error": "Failed to retrieve comments."}, status_code=500)
+
     @http_get('/{uuid:comment_id}', response=CommentDetailSchema)
     def get_comment_by_id(self, comment_id: uuid.UUID):
         """
@@ -247,12 +631,14 @@ class CommentController(ControllerBase):
             CommentDetailSchema: The details of the requested comment.
         """
         try:
-            comment = Comment.objects.get(id=comment_id)
+            comment = Comment.objects.select_related('author').get(
+                id=comment_id, post__is_deleted=False)
             logger.info(f"Comment retrieved: {comment.id}")
+            self.context.response.headers['ETag'] = _etag(comment)
             return CommentDetailSchema.from_orm(comment)
         except Comment.DoesNotExist:
             logger.warning(f"Comment with ID {comment_id} not found.")
-            return {"error": "Comment not found."}
+            return self.create_response({"error": "Comment not found."}, status_code=404)
         except Exception as e:
             logger.error(f"Error retrieving comment {comment_id}: {str(e)}")
             return {"error": "Failed to retrieve comment."}
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+class HubFull(Exception):
+    """Raised when the per-worker connection cap has been reached."""
+
+
+class Subscription:
+    """
+    A single listener on a hub channel.
+
+    Messages are buffered in a bounded queue. When a client falls too far
+    behind, the queue is drained and a ``None`` sentinel is pushed so the
+    stream can close and the client can reconnect instead of blocking fan-out.
+    """
+
+    def __init__(self, channel, queue_size):
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, message):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBackend:
+    """In-process backend: messages only reach subscribers in the same worker."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    async def start(self):
+        pass
+
+    def publish(self, channel, message):
+        self.hub.deliver(channel, message)
+
+
+class PostgresBackend:
+    """
+    Fan-out across workers with PostgreSQL LISTEN/NOTIFY.
+
+    Publishing runs ``pg_notify`` on the regular Django connection; each worker
+    keeps one dedicated async connection that listens and dispatches locally.
+    """
+
+    pg_channel = 'blog_broadcast'
+    # NOTIFY payloads are limited to 8000 bytes by PostgreSQL.
+    max_payload = 7900
+
+    def __init__(self, hub):
+        self.hub = hub
+        self._listener = None
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        import psycopg
+        from django.db import connections
+
+        # Django's own parameters, so OPTIONS such as sslmode/sslrootcert apply here too
+        params = connections['default'].get_connection_params()
+        # A sync cursor class; the async connection keeps its default
+        params.pop('cursor_factory', None)
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(**params, autocommit=True)
+                async with conn:
+                    await conn.execute(f"LISTEN {self.pg_channel}")
+                    async for notify in conn.notifies():
+                        envelope = json.loads(notify.payload)
+                        self.hub.dispatch(envelope['channel'], envelope['message'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast listener error, reconnecting: {str(e)}")
+                await asyncio.sleep(1)
+
+    def publish(self, channel, message):
+        from django.db import connection
+
+        payload = json.dumps({'channel': channel, 'message': message})
+        if len(payload.encode()) > self.max_payload:
+            # Too large for NOTIFY: tell listeners to refetch instead.
+            payload = json.dumps({
+                'channel': channel,
+                'message': {'event': 'resync', 'id': message.get('id'), 'data': '{}'},
+            })
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.pg_channel, payload])
+
+
+class BroadcastHub:
+    """
+    Per-worker fan-out of messages to async subscribers, keyed by channel.
+
+    The hub lives on the event loop of the ASGI worker. ``publish`` may be
+    called from any thread (e.g. a sync view's ``on_commit`` hook); delivery is
+    handed back to the loop thread.
+    """
+
+    def __init__(self, backend_path, max_connections, queue_size):
+        self.backend = import_string(backend_path)(self)
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection_count(self):
+        return self._count
+
+    async def subscribe(self, channel):
+        with self._lock:
+            if self._count >= self.max_connections:
+                raise HubFull()
+            self._count += 1
+        try:
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+                await self.backend.start()
+        except BaseException:
+            # Release the slot, and let the next subscriber retry starting the backend
+            self._loop = None
+            with self._lock:
+                self._count -= 1
+            raise
+        subscription = Subscription(channel, self.queue_size)
+        self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers is not None and subscription in subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+            with self._lock:
+                self._count -= 1
+
+    def publish(self, channel, message):
+        try:
+            self.backend.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Error publishing to channel {channel}: {str(e)}")
+
+    def deliver(self, channel, message):
+        """Hand a message to the loop thread; a no-op when nobody ever subscribed."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self.dispatch, channel, message)
+
+    def dispatch(self, channel, message):
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.offer(message)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """Return the process-wide hub, built from ``settings.COMMENT_STREAM``."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                options = settings.COMMENT_STREAM
+                _hub = BroadcastHub(
+                    options['BACKEND'],
+                    max_connections=options['MAX_CONNECTIONS'],
+                    queue_size=options['QUEUE_SIZE'],
+                )
+    return _hub
+
+
+async def event_stream(subscription, keepalive):
+    """
+    Render a subscription as a Server-Sent Events body.
+
+    Sends a comment line every ``keepalive`` seconds so proxies keep the
+    connection open, and always releases the hub slot when the client goes away.
+    """
+    hub = get_hub()
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                # Client fell behind; close so it reconnects and refetches.
+                yield "event: overflow\ndata: {}\n\n"
+                break
+            yield f"id: {message['id']}\nevent: {message['event']}\ndata: {message['data']}\n\n"
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,43 @@
+"""
+Time-ordered UUIDv7 primary keys (RFC 9562).
+
+A v7 UUID starts with the Unix time in milliseconds, so new keys are appended
+at the right edge of the primary-key B-tree instead of landing on a random
+page, and sorting by key sorts by creation time. Keys stay ordinary UUIDs:
+existing v4 rows remain valid and share the column.
+"""
+import secrets
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Generate a UUIDv7, monotonic within this process.
+
+    The 12-bit `rand_a` field is a counter seeded randomly each millisecond
+    (RFC 9562 method 1), so keys generated in the same millisecond, or after
+    the clock steps back, still sort in generation order.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Seed in the lower half so at least 2048 keys fit in one millisecond
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    value = ((ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64
+             | 0b10 << 62 | secrets.randbits(62))
+    return uuid.UUID(int=value)
@@ -0,0 +1,137 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+# Registered task callables, keyed by task name
+TASKS = {}
+
+
+def task(name):
+    """Register a function as a background task under `name`."""
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, **payload):
+    """
+    Queue a task to run in a `run_workers` process.
+
+    The job row is written from `transaction.on_commit`, so it is only created
+    once the surrounding write has committed and never adds work to the
+    request's own transaction.
+
+    Args:
+        name: The registered task name.
+        payload: JSON-serialisable keyword arguments for the task.
+    """
+    if name not in TASKS:
+        raise KeyError(f"Unknown task: {name}")
+
+    def create_job():
+        try:
+            Job.objects.create(task=name, payload=payload, run_after=timezone.now())
+        except Exception as e:
+            logger.error(f"Error enqueuing job {name}: {str(e)}")
+
+    transaction.on_commit(create_job)
+
+
+def claim_jobs(limit):
+    """
+    Claim up to `limit` runnable jobs for this worker.
+
+    Uses `SELECT ... FOR UPDATE SKIP LOCKED` where the database supports it so
+    concurrent workers never wait on each other. Jobs left `running` past the
+    lease (a crashed worker) become claimable again, unless they have used up
+    `JOB_QUEUE['MAX_ATTEMPTS']`, in which case they are marked failed.
+    """
+    options = settings.JOB_QUEUE
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=options['LEASE_SECONDS'])
+    runnable = (Q(status=Job.PENDING, run_after__lte=now)
+                | Q(status=Job.RUNNING, locked_at__lt=stale))
+    claimed = []
+    with transaction.atomic():
+        candidates = (Job.objects.select_for_update(skip_locked=True)
+                      .filter(runnable).order_by('run_after')[:limit])
+        for job in candidates:
+            if job.attempts >= options['MAX_ATTEMPTS']:
+                # Out of attempts with its lease expired: the job keeps killing its
+                # worker, so stop re-claiming it
+                Job.objects.filter(id=job.id, status=job.status, locked_at=job.locked_at).update(
+                    status=Job.FAILED, locked_at=None,
+                    last_error=job.last_error or "Lease expired on the final attempt.")
+                logger.error(f"Job {job.id} ({job.task}) failed permanently: lease expired "
+                             f"after {job.attempts} attempts")
+                continue
+            # Conditional update keeps claiming safe on backends without row locks
+            updated = Job.objects.filter(
+                id=job.id, status=job.status, locked_at=job.locked_at
+            ).update(status=Job.RUNNING, locked_at=now, attempts=job.attempts + 1)
+            if updated:
+                job.status, job.locked_at, job.attempts = Job.RUNNING, now, job.attempts + 1
+                claimed.append(job)
+    return claimed
+
+
+def run_job(job):
+    """
+    Execute a claimed job, deleting it on success or scheduling a retry.
+
+    Finished jobs are removed rather than kept, so the table only holds
+    pending, running and permanently failed work.
+    """
+    options = settings.JOB_QUEUE
+    try:
+        TASKS[job.task](**job.payload)
+    except Exception as e:
+        if job.attempts >= options['MAX_ATTEMPTS']:
+            logger.error(f"Job {job.id} ({job.task}) failed permanently: {str(e)}")
+            Job.objects.filter(id=job.id).update(status=Job.FAILED, last_error=str(e))
+        else:
+            delay = options['RETRY_BACKOFF_SECONDS'] * 2 ** (job.attempts - 1)
+            logger.warning(
+                f"Job {job.id} ({job.task}) failed, retrying in {delay}s: {str(e)}")
+            Job.objects.filter(id=job.id).update(
+                status=Job.PENDING, locked_at=None, last_error=str(e),
+                run_after=timezone.now() + datetime.timedelta(seconds=delay))
+        return False
+    Job.objects.filter(id=job.id).delete()
+    return True
+
+
+def run_worker(stop_event, burst=False):
+    """
+    Claim and run jobs until `stop_event` is set.
+
+    Args:
+        stop_event: A threading/multiprocessing Event used for shutdown.
+        burst: Exit as soon as the queue is empty instead of polling.
+    """
+    options = settings.JOB_QUEUE
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            jobs = claim_jobs(options['BATCH_SIZE'])
+        except Exception as e:
+            logger.error(f"Error claiming jobs: {str(e)}")
+            stop_event.wait(options['POLL_INTERVAL_SECONDS'])
+            continue
+        for job in jobs:
+            run_job(job)
+        if not jobs:
+            if burst:
+                break
+            stop_event.wait(options['POLL_INTERVAL_SECONDS'])
+    close_old_connections()
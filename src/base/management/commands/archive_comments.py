@@ -0,0 +1,51 @@
+import logging
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from base import partitions
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+class Command(BaseCommand):
+    help = "Move comments older than a number of months out of the live comment table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-months',
+            type=int,
+            default=settings.COMMENT_PARTITIONING['ARCHIVE_AFTER_MONTHS'],
+            help='Archive comments created before the start of this many months ago'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows moved per batch when copying to the archive table (non-partitioned tables)'
+        )
+
+    def handle(self, *args, **kwargs):
+        months = kwargs['older_than_months']
+
+        if months <= 0:
+            error_message = "The '--older-than-months' argument must be a positive integer."
+            logger.error(error_message)
+            self.stderr.write(self.style.ERROR(error_message))
+            return
+
+        cutoff = partitions.month_start(timezone.now(), -months)
+        try:
+            if partitions.is_partitioned():
+                # Whole partitions are detached: no rows are copied
+                detached = partitions.detach_partitions(cutoff)
+                success_message = f"Detached {len(detached)} comment partitions older than {cutoff:%Y-%m}."
+            else:
+                moved = partitions.archive_rows(cutoff, kwargs['batch_size'])
+                success_message = f"Archived {moved} comments older than {cutoff:%Y-%m}."
+            logger.info(success_message)
+            self.stdout.write(self.style.SUCCESS(success_message))
+        except Exception as e:
+            error_message = f"Error archiving comments: {str(e)}"
+            logger.error(error_message)
+            self.stderr.write(self.style.ERROR(error_message))
@@ -1,5 +1,4 @@
 import logging
-import uuid
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from base.models import Post, Comment
@@ -51,7 +50,6 @@ class Command(BaseCommand):
                 post = faker.random_element(elements=posts)
 
                 Comment.objects.create(
-                    id=uuid.uuid4(),
                     post=post,
                     author=author,
                     text=faker.paragraph()
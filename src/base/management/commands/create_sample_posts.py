@@ -1,8 +1,8 @@
 import logging
-import uuid
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from base.models import Post
+from base.rendering import rendered_fields
 from faker import Faker
 
 # Initialize logger
@@ -47,11 +47,12 @@ class Command(BaseCommand):
             for _ in range(count):
                 # Randomly select an author
                 author = faker.random_element(elements=authors)
+                content = faker.paragraph()
                 Post.objects.create(
-                    id=uuid.uuid4(),
                     title=faker.sentence(),
-                    content=faker.paragraph(),
-                    author=author
+                    content=content,
+                    author=author,
+                    **rendered_fields(content)
                 )
 
             success_message = f"{count} sample posts created successfully."
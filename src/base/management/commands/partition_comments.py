@@ -0,0 +1,45 @@
+import logging
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from base import partitions
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+class Command(BaseCommand):
+    help = "Partition the comment table by month (PostgreSQL) and create upcoming partitions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--enable',
+            action='store_true',
+            help='Convert the comment table to a range-partitioned table (one-off, opt-in)'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.COMMENT_PARTITIONING['MONTHS_AHEAD'],
+            help='Number of future monthly partitions to keep ready'
+        )
+
+    def handle(self, *args, **kwargs):
+        months_ahead = kwargs['months_ahead']
+        try:
+            if kwargs['enable']:
+                created = partitions.enable_partitioning(months_ahead)
+            elif not partitions.is_partitioned():
+                error_message = "The comment table is not partitioned. Run with --enable first (PostgreSQL only)."
+                logger.error(error_message)
+                self.stderr.write(self.style.ERROR(error_message))
+                return
+            else:
+                created = partitions.maintain_partitions(months_ahead)
+
+            success_message = f"{len(created)} comment partitions created."
+            logger.info(success_message)
+            self.stdout.write(self.style.SUCCESS(success_message))
+        except Exception as e:
+            error_message = f"Error maintaining comment partitions: {str(e)}"
+            logger.error(error_message)
+            self.stderr.write(self.style.ERROR(error_message))
@@ -0,0 +1,98 @@
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from base.models import Post
+from base.rendering import content_hash, render_content
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+def render_batch(batch):
+    """Render (id, content) pairs in a worker process; no database access."""
+    return [(post_id, render_content(content), content_hash(content)) for post_id, content in batch]
+
+
+class Command(BaseCommand):
+    help = "Re-render stored post HTML whose content or renderer version changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=None,
+            help='Number of rendering processes (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Posts rendered and saved per batch'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every post even if its hash is current'
+        )
+
+    def stale_batches(self, batch_size, force):
+        """Yield batches of (id, content) for posts whose stored hash is out of date."""
+        batch = []
+        posts = Post.all_objects.values_list('id', 'content', 'content_hash').iterator(chunk_size=batch_size)
+        for post_id, content, stored_hash in posts:
+            if force or stored_hash != content_hash(content):
+                batch.append((post_id, content))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def save(self, futures):
+        count = 0
+        for future in futures:
+            results = future.result()
+            Post.all_objects.bulk_update(
+                [Post(id=post_id, content_html=html, content_hash=digest)
+                 for post_id, html, digest in results],
+                ['content_html', 'content_hash'],
+            )
+            count += len(results)
+        return count
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+
+        if batch_size <= 0:
+            error_message = "The '--batch-size' argument must be a positive integer."
+            logger.error(error_message)
+            self.stderr.write(self.style.ERROR(error_message))
+            return
+
+        processes = kwargs['processes'] or os.cpu_count() or 1
+        try:
+            # Worker processes must not inherit open database connections
+            connections.close_all()
+            rendered = 0
+            # Under spawn/forkserver each worker is a fresh interpreter that imports this
+            # module, and with it the models, to unpickle render_batch: set Django up first
+            with ProcessPoolExecutor(max_workers=processes, initializer=django.setup) as pool:
+                pending = set()
+                for batch in self.stale_batches(batch_size, kwargs['force']):
+                    pending.add(pool.submit(render_batch, batch))
+                    # Bound the batches in flight so memory stays flat on large tables
+                    if len(pending) >= processes * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        rendered += self.save(done)
+                rendered += self.save(wait(pending).done)
+
+            success_message = f"{rendered} posts re-rendered."
+            logger.info(success_message)
+            self.stdout.write(self.style.SUCCESS(success_message))
+        except Exception as e:
+            error_message = f"Error re-rendering posts: {str(e)}"
+            logger.error(error_message)
+            raise CommandError(error_message)
@@ -0,0 +1,97 @@
+import logging
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+def worker_process(stop_event, burst):
+    """
+    Entry point of a worker process.
+
+    Under the spawn and forkserver start methods the child is a fresh
+    interpreter, so Django is set up before anything imports the models.
+    """
+    import django
+    django.setup()
+    from base.jobs import run_worker
+
+    def shutdown(signum, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    run_worker(stop_event, burst)
+
+
+class Command(BaseCommand):
+    help = "Run background job workers that process the database-backed job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of concurrent workers (default: 4)'
+        )
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Run workers as separate processes instead of threads'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling for new jobs'
+        )
+
+    def handle(self, *args, **kwargs):
+        count = kwargs['workers']
+        burst = kwargs['burst']
+
+        if count <= 0:
+            error_message = "The '--workers' argument must be a positive integer."
+            logger.error(error_message)
+            self.stderr.write(self.style.ERROR(error_message))
+            return
+
+        if kwargs['processes']:
+            # Children must not share the parent's database connections
+            connections.close_all()
+            stop_event = multiprocessing.Event()
+            workers = [multiprocessing.Process(target=worker_process, args=(stop_event, burst))
+                       for _ in range(count)]
+        else:
+            from base.jobs import run_worker
+
+            stop_event = threading.Event()
+            workers = [threading.Thread(target=run_worker, args=(stop_event, burst))
+                       for _ in range(count)]
+
+        def shutdown(signum, frame):
+            logger.info("Job workers shutting down.")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        for worker in workers:
+            worker.start()
+        mode = 'processes' if kwargs['processes'] else 'threads'
+        start_message = f"Started {count} job worker {mode}."
+        logger.info(start_message)
+        self.stdout.write(self.style.SUCCESS(start_message))
+
+        for worker in workers:
+            worker.join()
+        failed = [worker.exitcode for worker in workers if getattr(worker, 'exitcode', 0)]
+        if failed:
+            error_message = f"{len(failed)} job worker process(es) exited abnormally (exit codes: {failed})."
+            logger.error(error_message)
+            raise CommandError(error_message)
+        self.stdout.write(self.style.SUCCESS("Job workers stopped."))
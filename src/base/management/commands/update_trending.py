@@ -0,0 +1,39 @@
+import logging
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from base import trending
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+class Command(BaseCommand):
+    help = "Renormalize trending post scores, or rebuild them from recent comments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute all scores from comments instead of renormalizing'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.TRENDING['REBUILD_DAYS'],
+            help='Days of comments to include when rebuilding'
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            if kwargs['rebuild']:
+                count = trending.rebuild(kwargs['days'])
+                success_message = f"Trending scores rebuilt for {count} posts."
+            else:
+                pruned = trending.renormalize()
+                success_message = f"Trending scores renormalized, {pruned} stale entries pruned."
+            logger.info(success_message)
+            self.stdout.write(self.style.SUCCESS(success_message))
+        except Exception as e:
+            error_message = f"Error updating trending scores: {str(e)}"
+            logger.error(error_message)
+            self.stderr.write(self.style.ERROR(error_message))
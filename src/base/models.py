@@ -2,30 +2,120 @@ from django.contrib.auth import get_user_model
 from django.db import models
 import uuid
 
+from .ids import uuid7
+
 User = get_user_model()
 
 
+class LivePostManager(models.Manager):
+    """Default manager for posts: hides posts that are pending deletion."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Post(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Time-ordered keys: inserts append to the index and `id` order is creation order
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=255)
     content = models.TextField()
+    # Rendered once on write (see base.rendering); the hash covers content and renderer version
+    content_html = models.TextField(blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='')
     author = models.ForeignKey(
         User, on_delete=models.CASCADE)  # Link to User model
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by delete_post; the row and its comments are purged by a background job
+    is_deleted = models.BooleanField(default=False)
+
+    objects = LivePostManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Serves prefix searches on title (LIKE 'term%') in the admin
+            models.Index(fields=['title'], name='base_post_title_prefix_idx',
+                         opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self):
         return self.title
 
 
 class Comment(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     post = models.ForeignKey(
         Post, related_name="comments", on_delete=models.CASCADE)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE)
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Serves keyset pages of a post's comments (post_id = X AND id > cursor ORDER BY id)
+            models.Index(fields=['post', 'id'], name='base_comment_post_id_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post.title}"
+
+
+class TrendingScore(models.Model):
+    """
+    Time-decayed comment activity per post, maintained incrementally.
+
+    Scores are stored relative to `TrendingEpoch.epoch` (forward decay), so
+    existing rows never need rewriting as time passes; only comparisons
+    between rows matter for ranking.
+    """
+    post = models.OneToOneField(
+        Post, primary_key=True, related_name="trending", on_delete=models.CASCADE)
+    score = models.FloatField(default=0.0, db_index=True)
+
+    def __str__(self):
+        return f"{self.post_id}: {self.score:.3f}"
+
+
+class TrendingEpoch(models.Model):
+    """Single-row reference time for `TrendingScore`, moved forward on renormalization."""
+    epoch = models.DateTimeField()
+
+    def __str__(self):
+        return self.epoch.isoformat()
+
+
+class Job(models.Model):
+    """A unit of deferred work, claimed and executed by `run_workers`."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'  # No longer written: run_job deletes finished jobs
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Serves the worker's claim query
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
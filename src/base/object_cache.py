@@ -0,0 +1,79 @@
+"""
+Read-through cache of serialized posts and comments for the batch endpoints.
+
+Enabled by pointing `OBJECT_CACHE['CACHE_ALIAS']` at a cache shared by all
+workers (e.g. Redis or Memcached); writes invalidate entries once they
+commit, which a per-process cache could not do for the other workers.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from blog.routers import use_replica
+
+FORMATS = ('markdown', 'html')
+
+
+def get_cache():
+    """The configured object cache, or None when caching is disabled."""
+    alias = settings.OBJECT_CACHE['CACHE_ALIAS']
+    return caches[alias] if alias else None
+
+
+def post_key(post_id, format):
+    return f"blog:post:{post_id}:{format}"
+
+
+def comment_key(comment_id):
+    return f"blog:comment:{comment_id}"
+
+
+def fetch_many(ids, key, load):
+    """
+    Resolve `ids` to serialized objects, reading the cache before the database.
+
+    Args:
+        ids: The object IDs to resolve.
+        key: Function mapping an ID to its cache key.
+        load: Function loading a list of IDs from the database in one query,
+            returning a dict of the serialized objects found, by ID. With the
+            cache enabled it reads from the primary, since a lagging replica's
+            rows would be cached for every client.
+
+    Returns:
+        dict: The serialized objects found, by ID. Missing IDs are absent.
+    """
+    cache = get_cache()
+    found = {}
+    if cache is not None:
+        keys = {key(object_id): object_id for object_id in ids}
+        for cache_key, value in cache.get_many(list(keys)).items():
+            found[keys[cache_key]] = value
+    misses = [object_id for object_id in ids if object_id not in found]
+    if misses:
+        # Cached rows are served to every client, so never fill the cache from a lagging replica
+        token = use_replica.set(use_replica.get() and cache is None)
+        try:
+            loaded = load(misses)
+        finally:
+            use_replica.reset(token)
+        found.update(loaded)
+        if cache is not None and loaded:
+            cache.set_many({key(object_id): value for object_id, value in loaded.items()},
+                           settings.OBJECT_CACHE['TIMEOUT'])
+    return found
+
+
+def _delete_on_commit(keys):
+    cache = get_cache()
+    if cache is not None and keys:
+        # Deleting before commit would let a concurrent read cache the old row again
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_posts(post_ids):
+    _delete_on_commit([post_key(post_id, format) for post_id in post_ids for format in FORMATS])
+
+
+def invalidate_comments(comment_ids):
+    _delete_on_commit([comment_key(comment_id) for comment_id in comment_ids])
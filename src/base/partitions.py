@@ -0,0 +1,172 @@
+import datetime
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Comment
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+TABLE = Comment._meta.db_table
+ARCHIVE_TABLE = f"{TABLE}_archive"
+
+
+def month_start(value, offset=0):
+    """First instant (UTC) of the month containing `value`, shifted by `offset` months."""
+    month_index = value.year * 12 + value.month - 1 + offset
+    return datetime.datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def partition_name(start):
+    return f"{TABLE}_p{start:%Y_%m}"
+
+
+def is_partitioned():
+    """True when the comment table is a PostgreSQL range-partitioned table."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def create_partitions(start, months):
+    """Create monthly partitions from `start` for `months` months, skipping existing ones."""
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months):
+            lower, upper = month_start(start, offset), month_start(start, offset + 1)
+            name = partition_name(lower)
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is not None:
+                continue
+            # DDL takes no bind parameters under server-side binding; the bounds are our own datetimes
+            cursor.execute(
+                f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')")
+            created.append(name)
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+    return created
+
+
+def enable_partitioning(months_ahead):
+    """
+    Convert the comment table into a table range-partitioned by `created_at` month.
+
+    Runs in one transaction: the existing table is renamed, a partitioned table
+    with the same columns is created, partitions are added from the oldest
+    comment up to `months_ahead` months from now, and the rows are copied over.
+    Once the old table is dropped, the keys and indexes are recreated.
+
+    The model's Meta indexes keep the names in Django's migration state. The
+    rest differ from a plain migrated table, which Django tolerates because it
+    finds them by column: PostgreSQL requires the partition key in the primary
+    key, so it becomes (id, created_at); `<table>_post_created_idx` on
+    (post_id, created_at) replaces the post_id index and lets per-post queries
+    prune partitions; the author_id/created_at indexes and the foreign keys
+    get `<table>_*` names.
+    """
+    if connection.vendor != 'postgresql':
+        raise RuntimeError("Comment partitioning requires PostgreSQL.")
+    if is_partitioned():
+        return []
+
+    legacy = f"{TABLE}_unpartitioned"
+    post_table = Comment._meta.get_field('post').related_model._meta.db_table
+    user_table = Comment._meta.get_field('author').related_model._meta.db_table
+    with connection.schema_editor() as editor, connection.cursor() as cursor:
+        cursor.execute(f'SELECT min(created_at) FROM "{TABLE}"')
+        oldest = cursor.fetchone()[0] or timezone.now()
+        # Run deferred foreign-key checks queued earlier in this transaction, or the old table can't be dropped
+        editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        editor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{legacy}"')
+        editor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f"PARTITION BY RANGE (created_at)")
+
+        now = timezone.now()
+        first = month_start(oldest)
+        months = (now.year - first.year) * 12 + now.month - first.month + 1 + months_ahead
+        created = create_partitions(first, months)
+
+        editor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{legacy}"')
+        # Dropping the old table frees its index and constraint names for reuse
+        editor.execute(f'DROP TABLE "{legacy}"')
+
+        editor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id, created_at)')
+        editor.execute(f'CREATE INDEX "{TABLE}_post_created_idx" ON "{TABLE}" (post_id, created_at)')
+        editor.execute(f'CREATE INDEX "{TABLE}_author_idx" ON "{TABLE}" (author_id)')
+        editor.execute(f'CREATE INDEX "{TABLE}_created_idx" ON "{TABLE}" (created_at)')
+        for index in Comment._meta.indexes:
+            editor.add_index(Comment, index)
+        editor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_post_fk" FOREIGN KEY (post_id) '
+            f'REFERENCES "{post_table}" (id) DEFERRABLE INITIALLY DEFERRED')
+        editor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_author_fk" FOREIGN KEY (author_id) '
+            f'REFERENCES "{user_table}" (id) DEFERRABLE INITIALLY DEFERRED')
+    logger.info(f"Comment table partitioned into {len(created)} monthly partitions.")
+    return created
+
+
+def maintain_partitions(months_ahead):
+    """Make sure partitions exist for the current month and `months_ahead` months after it."""
+    with transaction.atomic():
+        created = create_partitions(month_start(timezone.now()), months_ahead + 1)
+    if created:
+        logger.info(f"Created comment partitions: {', '.join(created)}")
+    return created
+
+
+def detach_partitions(before):
+    """
+    Detach every monthly partition that ends on or before `before` and rename
+    it `<table>_archive_YYYY_MM`. The data stays in the database, outside the
+    live table.
+    """
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND c.relname LIKE %s ORDER BY c.relname",
+            [TABLE, f"{TABLE}\\_p%"])
+        for (name,) in cursor.fetchall():
+            year, month = int(name[-7:-3]), int(name[-2:])
+            start = datetime.datetime(year, month, 1, tzinfo=datetime.timezone.utc)
+            if month_start(start, 1) > before:
+                continue
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'ALTER TABLE "{name}" RENAME TO "{ARCHIVE_TABLE}_{start:%Y_%m}"')
+            detached.append(name)
+    return detached
+
+
+def archive_rows(before, batch_size):
+    """
+    Move comments created before `before` into the `<table>_archive` table in
+    batches. Used where native partitioning is unavailable (e.g. SQLite).
+    """
+    columns = ", ".join(f'"{field.column}"' for field in Comment._meta.concrete_fields)
+    moved = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{ARCHIVE_TABLE}" AS SELECT {columns} FROM "{TABLE}" WHERE 0 = 1')
+    while True:
+        ids = list(Comment.objects.filter(created_at__lt=before)
+                   .values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            params = [Comment._meta.pk.get_db_prep_value(pk, connection) for pk in ids]
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(
+                f'INSERT INTO "{ARCHIVE_TABLE}" ({columns}) '
+                f'SELECT {columns} FROM "{TABLE}" WHERE id IN ({placeholders})', params)
+            cursor.execute(f'DELETE FROM "{TABLE}" WHERE id IN ({placeholders})', params)
+        moved += len(ids)
+    return moved
@@ -0,0 +1,28 @@
+import hashlib
+
+from markdown_it import MarkdownIt
+
+# Bump when the renderer or its options change so `render_posts` re-renders everything
+RENDERER_VERSION = '1'
+
+# 'js-default' disables raw HTML (it is escaped) and rejects unsafe link schemes
+# such as javascript:, so the output needs no separate sanitization pass.
+_markdown = MarkdownIt('js-default')
+
+
+def content_hash(content):
+    """Hash identifying `content` as rendered by the current renderer version."""
+    return hashlib.sha256(f"{RENDERER_VERSION}:{content}".encode()).hexdigest()
+
+
+def render_content(content):
+    """Render post Markdown to sanitized HTML."""
+    return _markdown.render(content)
+
+
+def rendered_fields(content):
+    """Model field values for storing `content` with its rendered HTML."""
+    return {
+        'content_html': render_content(content),
+        'content_hash': content_hash(content),
+    }
@@ -59,7 +59,7 @@ class PostDetailSchema(Schema):
     Attributes:
         id: The unique identifier of the blog post (UUID).
         title: The title of the blog post.
-        content: The content of the blog post.
+        content: The content of the blog post (Markdown, or rendered HTML with `format=html`).
         author: The username of the author who created the post.
         created_at: The timestamp when the post was created, formatted as a string.
         updated_at: The timestamp when the post was last updated, formatted as a string.
@@ -72,17 +72,53 @@ class PostDetailSchema(Schema):
     updated_at: str  # Convert to string
 
     @classmethod
-    def from_orm(cls, post):
+    def from_orm(cls, post, html=False):
         return cls(
             id=post.id,
             title=post.title,
-            content=post.content,
+            content=post.content_html if html else post.content,  # Pre-rendered HTML on request
             author=post.author.username,  # Convert the User object to a string
             created_at=post.created_at.isoformat(),  # Format datetime as string
             updated_at=post.updated_at.isoformat()  # Format datetime as string
         )
 
 
+class PostBatchSchema(Schema):
+    """
+    Schema for a batch of blog posts requested by ID.
+
+    Attributes:
+        items: The posts found, in the order they were requested.
+        missing: The requested IDs with no matching post.
+    """
+    items: list[PostDetailSchema]
+    missing: list[UUID]
+
+
+class PostPageSchema(Schema):
+    """
+    Schema for a keyset-paginated page of blog posts.
+
+    Attributes:
+        items: The posts in the page, in ID order.
+        next: The cursor to pass as `after` for the next page, or None on the last page.
+    """
+    items: list[PostDetailSchema]
+    next: Optional[UUID] = None
+
+
+class TrendingPageSchema(Schema):
+    """
+    Schema for a page of trending posts.
+
+    Attributes:
+        items: The posts in the page, highest score first.
+        next: The cursor to pass as `after` for the next page, or None on the last page.
+    """
+    items: list[PostDetailSchema]
+    next: Optional[str] = None
+
+
 # Schema for creating a new comment
 class CommentCreateSchema(Schema):
     """
@@ -120,19 +156,46 @@ class CommentDetailSchema(Schema):
         author: The username of the author who created the comment.
         text: The content of the comment.
         created_at: The timestamp when the comment was created, formatted as a string.
+        updated_at: The timestamp when the comment was last updated, formatted as a string.
     """
     id: UUID
     post: UUID
     author: str  # Display the author's username
     text: str
     created_at: str  # Convert to string
+    updated_at: str  # Convert to string
 
     @classmethod
     def from_orm(cls, comment):
         return cls(
             id=comment.id,
-            post=comment.post.id,  # Use the UUID of the related post
+            post=comment.post_id,  # Use the UUID of the related post without loading it
             author=comment.author.username,  # Get the author's username
             text=comment.text,
-            created_at=comment.created_at.isoformat()  # Format datetime as string
+            created_at=comment.created_at.isoformat(),  # Format datetime as string
+            updated_at=comment.updated_at.isoformat()  # Format datetime as string
         )
+
+
+class CommentBatchSchema(Schema):
+    """
+    Schema for a batch of comments requested by ID.
+
+    Attributes:
+        items: The comments found, in the order they were requested.
+        missing: The requested IDs with no matching comment.
+    """
+    items: list[CommentDetailSchema]
+    missing: list[UUID]
+
+
+class CommentPageSchema(Schema):
+    """
+    Schema for a keyset-paginated page of comments.
+
+    Attributes:
+        items: The comments in the page, in ID order.
+        next: The cursor to pass as `after` for the next page, or None on the last page.
+    """
+    items: list[CommentDetailSchema]
+    next: Optional[UUID] = None
@@ -0,0 +1,52 @@
+import logging
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from . import trending
+from .jobs import task
+from .models import Comment, Post
+from .object_cache import invalidate_comments
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+
+# Post-write side effects run by `run_workers`. Add cache invalidation, search
+# reindexing, counters or webhooks here rather than in the request path.
+
+@task('post_saved')
+def post_saved(post_id, created):
+    """Handle side effects of a post being created or updated."""
+    logger.info(f"Post {'created' if created else 'updated'} job processed: {post_id}")
+
+
+@task('comment_created')
+def comment_created(comment_id, post_id, created_at):
+    """Handle side effects of a new comment: bump the post's trending score."""
+    trending.record_comment(post_id, parse_datetime(created_at))
+    logger.info(f"Comment created job processed: {comment_id} for post {post_id}")
+
+
+@task('purge_post')
+def purge_post(post_id):
+    """
+    Permanently delete a soft-deleted post and its comments.
+
+    Comments are removed in batches of `COMMENT_DELETE_BATCH_SIZE` primary keys,
+    each batch its own short statement, so memory stays flat and no single
+    transaction spans the whole thread. Safe to re-run after a failure.
+    """
+    batch_size = settings.COMMENT_DELETE_BATCH_SIZE
+    deleted = 0
+    while True:
+        ids = list(Comment.objects.filter(post_id=post_id)
+                   .values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        # Comment has no dependants or delete signals, so this is a single fast DELETE
+        Comment.objects.filter(id__in=ids).delete()
+        invalidate_comments(ids)
+        deleted += len(ids)
+    Post.all_objects.filter(id=post_id, is_deleted=True).delete()
+    logger.info(f"Post purged: {post_id} ({deleted} comments)")
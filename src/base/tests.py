@@ -0,0 +1,369 @@
+"""
+Tests for the blog app (base).
+
+Run from `src/`:
+    python manage.py test base
+"""
+import datetime
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from ninja_jwt.tokens import RefreshToken
+
+from . import ids, partitions, trending
+from .admin import EstimatedCountPaginator
+from .api import _keyset_page
+from .broadcast import BroadcastHub, HubFull
+from .jobs import claim_jobs
+from .models import Comment, Job, Post, TrendingEpoch, TrendingScore
+
+
+class BroadcastHubTests(SimpleTestCase):
+    async def test_failed_backend_start_releases_the_slot(self):
+        hub = BroadcastHub('base.broadcast.LocalBackend', max_connections=1, queue_size=10)
+
+        async def fail():
+            raise RuntimeError("listener unavailable")
+
+        hub.backend.start = fail
+        # A leaked slot would turn the second attempt into HubFull
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                await hub.subscribe('post')
+        self.assertEqual(hub.connection_count, 0)
+
+    async def test_subscribe_respects_the_connection_cap(self):
+        hub = BroadcastHub('base.broadcast.LocalBackend', max_connections=1, queue_size=10)
+        subscription = await hub.subscribe('post')
+        with self.assertRaises(HubFull):
+            await hub.subscribe('post')
+        hub.unsubscribe(subscription)
+        self.assertEqual(hub.connection_count, 0)
+
+
+class UUID7Tests(SimpleTestCase):
+    ms = int(datetime.datetime(2100, 1, 1, tzinfo=datetime.timezone.utc).timestamp()) * 1000
+
+    def setUp(self):
+        # Each test starts from a fresh generator state, restored afterwards
+        patcher = mock.patch.multiple(ids, _last_ms=0, _counter=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def at(self, ms):
+        return mock.patch.object(ids.time, 'time_ns', return_value=ms * 1_000_000)
+
+    def test_bit_layout(self):
+        with self.at(self.ms):
+            key = ids.uuid7()
+        self.assertEqual(key.version, 7)
+        self.assertEqual(key.int >> 62 & 0b11, 0b10)
+        self.assertEqual(key.int >> 80, self.ms)
+
+    def test_monotonic_within_one_millisecond(self):
+        with self.at(self.ms):
+            keys = [ids.uuid7() for _ in range(1000)]
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertEqual({key.int >> 80 for key in keys}, {self.ms})
+
+    def test_monotonic_when_the_clock_steps_back(self):
+        with self.at(self.ms + 1):
+            first = ids.uuid7()
+        with self.at(self.ms):
+            second = ids.uuid7()
+        self.assertLess(first, second)
+
+    def test_counter_overflow_borrows_the_next_millisecond(self):
+        with mock.patch.multiple(ids, _last_ms=self.ms, _counter=0xFFF), self.at(self.ms):
+            key = ids.uuid7()
+        self.assertEqual(key.int >> 80, self.ms + 1)
+        self.assertEqual(key.int >> 64 & 0xFFF, 0)
+
+
+class JobQueueTests(TestCase):
+    def abandoned_job(self, attempts):
+        # Left running by a worker that died, with the lease long expired
+        expired = timezone.now() - datetime.timedelta(seconds=settings.JOB_QUEUE['LEASE_SECONDS'] + 1)
+        return Job.objects.create(task='post_saved', status=Job.RUNNING, attempts=attempts,
+                                  run_after=expired, locked_at=expired)
+
+    def test_expired_lease_is_reclaimed(self):
+        job = self.abandoned_job(attempts=1)
+        self.assertEqual([claimed.id for claimed in claim_jobs(10)], [job.id])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.RUNNING, 2))
+
+    def test_expired_lease_on_final_attempt_fails_the_job(self):
+        job = self.abandoned_job(attempts=settings.JOB_QUEUE['MAX_ATTEMPTS'])
+        self.assertEqual(claim_jobs(10), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+
+class ApiTestCase(TestCase):
+    """Base class for API tests: a user with a bearer token and a post with a comment."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='writer', password='x')
+        cls.post = Post.objects.create(title='title', content='content', author=cls.user)
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.user, text='text')
+
+    def setUp(self):
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def patch(self, path, data, **headers):
+        return self.client.patch(path, data, content_type='application/json',
+                                 headers={**self.headers, **headers})
+
+
+class KeysetPageTests(ApiTestCase):
+    def add_posts(self, count):
+        Post.objects.bulk_create(Post(title=f'post {n}', content='content', author=self.user)
+                                 for n in range(count))
+
+    def test_exactly_limit_rows_is_the_last_page(self):
+        self.add_posts(2)
+        rows, cursor = _keyset_page(Post.objects.all(), None, 3)
+        self.assertEqual(len(rows), 3)
+        self.assertIsNone(cursor)
+
+    def test_more_rows_than_limit_gives_the_last_key_as_cursor(self):
+        self.add_posts(3)
+        rows, cursor = _keyset_page(Post.objects.all(), None, 3)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(cursor, rows[-1].pk)
+
+    def test_pages_cover_every_row_once_in_key_order(self):
+        self.add_posts(6)
+        seen, cursor = [], None
+        while True:
+            rows, cursor = _keyset_page(Post.objects.all(), cursor, 2)
+            seen += [row.pk for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(Post.objects.values_list('pk', flat=True)))
+
+
+class ConditionalUpdateTests(ApiTestCase):
+    """If-Match handling of the post and comment update endpoints."""
+
+    def etag(self, path):
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def model_queries(self, context):
+        # Authentication's user lookup is not part of the update itself
+        return [query for query in context.captured_queries
+                if 'base_post' in query['sql'] or 'base_comment' in query['sql']]
+
+    def test_matching_etag_updates(self):
+        path = f'/api/posts/{self.post.id}'
+        etag = self.etag(path)
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch(path, {'title': 'new'}, if_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(Post.objects.get(id=self.post.id).title, 'new')
+        self.assertLessEqual(len(self.model_queries(context)), 2)
+
+    def test_stale_etag_returns_412_and_keeps_the_row(self):
+        path = f'/api/posts/{self.post.id}'
+        stale = self.etag(path)
+        self.patch(path, {'title': 'first'})
+        response = self.patch(path, {'title': 'second'}, if_match=stale)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(Post.objects.get(id=self.post.id).title, 'first')
+
+    def test_weak_etag_from_compressed_response_matches(self):
+        path = f'/api/posts/{self.post.id}'
+        response = self.patch(path, {'title': 'new'}, if_match=f'W/{self.etag(path)}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_post_returns_404(self):
+        response = self.patch(f'/api/posts/{Post._meta.pk.default()}', {'title': 'new'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_comment_matching_etag_updates(self):
+        path = f'/api/comments/{self.comment.id}'
+        etag = self.etag(path)
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch(path, {'text': 'new'}, if_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Comment.objects.get(id=self.comment.id).text, 'new')
+        self.assertLessEqual(len(self.model_queries(context)), 2)
+
+    def test_comment_stale_etag_returns_412_and_keeps_the_row(self):
+        path = f'/api/comments/{self.comment.id}'
+        stale = self.etag(path)
+        self.patch(path, {'text': 'first'})
+        response = self.patch(path, {'text': 'second'}, if_match=stale)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(Comment.objects.get(id=self.comment.id).text, 'first')
+
+    def test_missing_comment_returns_404(self):
+        response = self.patch(f'/api/comments/{Comment._meta.pk.default()}', {'text': 'new'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(OBJECT_CACHE={**settings.OBJECT_CACHE, 'CACHE_ALIAS': 'default'})
+class AdminCacheInvalidationTests(ApiTestCase):
+    """Admin edits and deletes reach the object cache behind the batch endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(cache.clear)
+        admin_user = get_user_model().objects.create_superuser(username='admin', password='x')
+        self.admin = self.client_class()
+        self.admin.force_login(admin_user)
+        # Fill the cache
+        self.batch('posts', self.post)
+        self.batch('comments', self.comment)
+
+    def batch(self, kind, obj):
+        response = self.client.get(f'/api/{kind}/batch', {'ids': str(obj.id)}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['items']
+
+    def admin_post(self, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin.post(url, data)
+        self.assertEqual(response.status_code, 302)
+
+    def test_post_change_invalidates_the_post(self):
+        self.admin_post(reverse('admin:base_post_change', args=[self.post.id]),
+                        {'title': 'edited', 'content': 'content', 'author': self.user.id})
+        self.assertEqual(self.batch('posts', self.post)[0]['title'], 'edited')
+
+    def test_post_delete_invalidates_the_post_and_its_comments(self):
+        self.admin_post(reverse('admin:base_post_delete', args=[self.post.id]), {'post': 'yes'})
+        self.assertEqual(self.batch('posts', self.post), [])
+        self.assertEqual(self.batch('comments', self.comment), [])
+
+    def test_post_bulk_delete_invalidates_the_posts_and_their_comments(self):
+        self.admin_post(reverse('admin:base_post_changelist'),
+                        {'action': 'delete_selected', '_selected_action': [self.post.id], 'post': 'yes'})
+        self.assertEqual(self.batch('posts', self.post), [])
+        self.assertEqual(self.batch('comments', self.comment), [])
+
+    def test_comment_change_invalidates_the_comment(self):
+        self.admin_post(reverse('admin:base_comment_change', args=[self.comment.id]),
+                        {'post': self.post.id, 'author': self.user.id, 'text': 'edited'})
+        self.assertEqual(self.batch('comments', self.comment)[0]['text'], 'edited')
+
+    def test_comment_bulk_delete_invalidates_the_comments(self):
+        self.admin_post(reverse('admin:base_comment_changelist'),
+                        {'action': 'delete_selected', '_selected_action': [self.comment.id], 'post': 'yes'})
+        self.assertEqual(self.batch('comments', self.comment), [])
+
+
+class TrendingTests(ApiTestCase):
+    """Keyset pagination of the trending endpoint and the score updates behind it."""
+
+    def setUp(self):
+        super().setUp()
+        TrendingEpoch.objects.create(id=1, epoch=timezone.now() - datetime.timedelta(hours=5))
+        # Tied scores are ordered by post ID
+        self.ranking = [self.post] + [
+            Post.objects.create(title=f'post {n}', content='content', author=self.user) for n in range(4)]
+        for post, score in zip(self.ranking, [8.0, 4.0, 4.0, 4.0, 1.0]):
+            TrendingScore.objects.create(post=post, score=score)
+        self.ranking[1:4] = sorted(self.ranking[1:4], key=lambda post: post.id)
+
+    def page(self, after=None):
+        params = {'limit': 2} if after is None else {'limit': 2, 'after': after}
+        response = self.client.get('/api/posts/trending', params, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return [post['id'] for post in body['items']], body['next']
+
+    def expected(self, start, stop):
+        return [str(post.id) for post in self.ranking[start:stop]]
+
+    def test_pages_follow_the_ranking(self):
+        first, cursor = self.page()
+        second, cursor = self.page(cursor)
+        third, cursor = self.page(cursor)
+        self.assertEqual((first, second, third), (self.expected(0, 2), self.expected(2, 4), self.expected(4, 5)))
+        self.assertIsNone(cursor)
+
+    def test_cursor_survives_renormalization(self):
+        first, cursor = self.page()
+        trending.renormalize()
+        second, _ = self.page(cursor)
+        self.assertEqual((first, second), (self.expected(0, 2), self.expected(2, 4)))
+
+    def test_malformed_cursor_returns_400(self):
+        response = self.client.get('/api/posts/trending', {'after': 'nope'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_comment_on_purged_post_is_skipped(self):
+        # The job outlived its post; a score row would fail the deferred foreign key check
+        purged = ids.uuid7()
+        trending.record_comment(purged, timezone.now())
+        self.assertFalse(TrendingScore.objects.filter(post_id=purged).exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', "Comment partitioning requires PostgreSQL")
+class CommentPartitioningTests(ApiTestCase):
+    """enable_partitioning and what depends on it, run against a real PostgreSQL database."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        old = Comment.objects.create(post=self.post, author=self.user, text='old')
+        Comment.objects.filter(id=old.id).update(created_at=partitions.month_start(self.now, -2))
+
+    def index_names(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [partitions.TABLE])
+            return {name for (name,) in cursor.fetchall()}
+
+    def test_enable_partitioning_keeps_rows_and_migration_state(self):
+        created = partitions.enable_partitioning(months_ahead=1)
+        self.assertTrue(partitions.is_partitioned())
+        self.assertEqual(created, [partitions.partition_name(partitions.month_start(self.now, offset))
+                                   for offset in range(-2, 2)])
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(partitions.enable_partitioning(months_ahead=1), [])
+
+        # Meta indexes keep the names in Django's migration state
+        for index in Comment._meta.indexes:
+            self.assertIn(index.name, self.index_names())
+        with connection.schema_editor() as editor:
+            editor.remove_index(Comment, Comment._meta.indexes[0])
+            editor.add_index(Comment, Comment._meta.indexes[0])
+
+        # New comments land in the current month's partition and are served by the API
+        response = self.client.post('/api/comments', {'post': str(self.post.id), 'text': 'new'},
+                                    content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/comments/post/{self.post.id}/cursor', headers=self.headers)
+        self.assertEqual(len(response.json()['items']), 3)
+
+    def test_detach_partitions_archives_old_months(self):
+        partitions.enable_partitioning(months_ahead=1)
+        detached = partitions.detach_partitions(partitions.month_start(self.now, -1))
+        self.assertEqual(detached, [partitions.partition_name(partitions.month_start(self.now, -2))])
+        self.assertEqual(list(Comment.objects.values_list('text', flat=True)), ['text'])
+
+    def test_admin_count_estimate_sums_partitions(self):
+        created = partitions.enable_partitioning(months_ahead=1)
+        # Autovacuum analyzes the partitions but never the partitioned parent
+        with connection.cursor() as cursor:
+            for name in created:
+                cursor.execute(f'ANALYZE "{name}"')
+        paginator = EstimatedCountPaginator(Comment.objects.order_by('id'), 10)
+        paginator.exact_count_threshold = 0
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(paginator.count, 2)
+        self.assertNotIn('COUNT(', context.captured_queries[-1]['sql'].upper())
@@ -0,0 +1,129 @@
+import datetime
+import logging
+import math
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Comment, Post, TrendingEpoch, TrendingScore
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+# Renormalize well before 2 ** exponent overflows a float (exponent 1024)
+MAX_EXPONENT = 512
+
+
+def _half_life_seconds():
+    return settings.TRENDING['HALF_LIFE_HOURS'] * 3600
+
+
+def _exponent(at, epoch):
+    return (at - epoch).total_seconds() / _half_life_seconds()
+
+
+def get_epoch():
+    return TrendingEpoch.objects.get_or_create(id=1, defaults={'epoch': timezone.now()})[0].epoch
+
+
+def _locked_epoch():
+    """
+    Read the epoch inside the current transaction, locked against `renormalize`.
+
+    PostgreSQL takes `FOR SHARE`, so concurrent comments don't wait for each
+    other, only for a renormalization holding the row `FOR UPDATE`.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT epoch FROM "{TrendingEpoch._meta.db_table}" WHERE id = 1 FOR SHARE')
+            row = cursor.fetchone()
+        return row[0] if row else None
+    state = TrendingEpoch.objects.select_for_update().filter(id=1).first()
+    return state.epoch if state else None
+
+
+def rescale(score, epoch):
+    """
+    Express a score stored relative to `epoch` relative to the current epoch,
+    multiplying by the same factor `renormalize` applied to the stored scores.
+    """
+    current = get_epoch()
+    if current == epoch:
+        return score
+    return score * 2.0 ** -_exponent(current, epoch)
+
+
+def record_comment(post_id, at):
+    """
+    Add one comment made at `at` to the post's trending score.
+
+    A comment is worth 2 ** ((at - epoch) / half_life), so later comments
+    outweigh older ones exactly as if every score decayed continuously, while
+    each write stays a single-row `UPDATE score = score + w`. The epoch is read
+    and the score updated in one transaction holding the epoch row, so a
+    concurrent `renormalize` can't rescale the scores in between. Comments on
+    a post purged before the job ran are skipped: the score row's deferred
+    foreign key would fail the commit, and retries would never succeed.
+    """
+    if _exponent(at, get_epoch()) > MAX_EXPONENT:
+        renormalize()
+    with transaction.atomic():
+        epoch = _locked_epoch()
+        if epoch is None:
+            # The row was deleted since get_epoch() above; recreate it
+            epoch = get_epoch()
+        if not Post.all_objects.filter(id=post_id).exists():
+            logger.info(f"Trending update skipped, post already purged: {post_id}")
+            return
+        weight = 2.0 ** _exponent(at, epoch)
+        if TrendingScore.objects.filter(post_id=post_id).update(score=F('score') + weight):
+            return
+        try:
+            with transaction.atomic():
+                TrendingScore.objects.create(post_id=post_id, score=weight)
+        except IntegrityError:
+            # Another worker created the row first
+            TrendingScore.objects.filter(post_id=post_id).update(score=F('score') + weight)
+
+
+def renormalize():
+    """
+    Move the epoch to now and rescale every score to match, then drop rows
+    whose decayed score fell below `TRENDING['MIN_SCORE']` to keep the table
+    compact. Ranking is unchanged.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        state, _ = TrendingEpoch.objects.select_for_update().get_or_create(
+            id=1, defaults={'epoch': now})
+        factor = 2.0 ** -_exponent(now, state.epoch)
+        TrendingScore.objects.update(score=F('score') * factor)
+        pruned, _ = TrendingScore.objects.filter(score__lt=settings.TRENDING['MIN_SCORE']).delete()
+        state.epoch = now
+        state.save(update_fields=['epoch'])
+    logger.info(f"Trending scores renormalized (factor {factor:.3g}, {pruned} pruned).")
+    return pruned
+
+
+def rebuild(days):
+    """Recompute all scores from the comments of the last `days` days."""
+    now = timezone.now()
+    since = now - datetime.timedelta(days=days)
+    half_life = _half_life_seconds()
+    scores = {}
+    comments = (Comment.objects.filter(created_at__gte=since, post__is_deleted=False)
+                .values_list('post_id', 'created_at').iterator(chunk_size=5000))
+    for post_id, created_at in comments:
+        scores[post_id] = scores.get(post_id, 0.0) + math.pow(
+            2.0, (created_at - now).total_seconds() / half_life)
+    with transaction.atomic():
+        TrendingEpoch.objects.update_or_create(id=1, defaults={'epoch': now})
+        TrendingScore.objects.all().delete()
+        TrendingScore.objects.bulk_create(
+            [TrendingScore(post_id=post_id, score=score) for post_id, score in scores.items()],
+            batch_size=1000)
+    logger.info(f"Trending scores rebuilt for {len(scores)} posts.")
+    return len(scores)
@@ -0,0 +1,76 @@
+"""
+Response compression benchmark.
+
+Compresses a realistic post-list payload with every available coding and
+level and reports the CPU cost against the bytes saved, to help choose
+`COMPRESSION['LEVELS']` and `COMPRESSION['MIN_SIZE']`.
+
+Usage (from `src/`):
+    python benchmarks/compression.py --posts 50 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+from faker import Faker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blog import compression  # noqa: E402
+
+LEVELS = {
+    'gzip': (1, 6, 9),
+    'br': (1, 4, 6, 11),
+    'zstd': (1, 3, 9, 19),
+}
+
+
+def post_list_payload(posts):
+    """A JSON body shaped like a `GET /api/posts` page with full content."""
+    faker = Faker()
+    Faker.seed(0)
+    items = [{
+        'id': str(uuid.UUID(int=faker.random.getrandbits(128))),
+        'title': faker.sentence(),
+        'content': '\n\n'.join(faker.paragraphs(nb=8)),
+        'author': faker.user_name(),
+        'created_at': faker.date_time().isoformat(),
+        'updated_at': faker.date_time().isoformat(),
+    } for _ in range(posts)]
+    return json.dumps({'items': items, 'count': posts}).encode()
+
+
+def measure(encoding, level, payload, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        compressed = compression.compress(encoding, level, payload)
+    cpu_ms = (time.process_time() - start) * 1000 / repeat
+    return len(compressed), cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=10, help='Posts per payload (default: one page)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    payload = post_list_payload(args.posts)
+    size = len(payload)
+    print(f"Payload: {args.posts} posts, {size / 1024:.1f} KiB")
+    print(f"{'coding':<6} {'level':>5} {'bytes':>9} {'ratio':>6} {'cpu ms':>8} {'KiB saved/cpu ms':>17}")
+    for encoding in compression.ENCODERS:
+        for level in LEVELS[encoding]:
+            compressed, cpu_ms = measure(encoding, level, payload, args.repeat)
+            saved_kib = (size - compressed) / 1024
+            print(f"{encoding:<6} {level:>5} {compressed:>9} {size / compressed:>6.2f} "
+                  f"{cpu_ms:>8.3f} {saved_kib / max(cpu_ms, 1e-6):>17.1f}")
+    missing = {'br', 'zstd'} - set(compression.ENCODERS)
+    if missing:
+        print(f"\nNot installed: {', '.join(sorted(missing))} (pip install brotli zstandard)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Startup-time benchmark for the blog API.
+
+Reports a `python -X importtime` breakdown of the slowest top-level imports
+during `django.setup()` plus URLconf loading, and the time from interpreter
+start to the first `/api/openapi.json` response. Exits non-zero when the
+time-to-first-response exceeds the budget.
+
+Usage (from `src/`):
+    python benchmarks/startup.py --budget-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = (
+    "import os, django;"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings');"
+    "django.setup();"
+    "import blog.urls;"
+)
+
+FIRST_RESPONSE = SETUP + (
+    "from django.test import Client;"
+    "from django.test.utils import setup_test_environment;"
+    "setup_test_environment();"
+    "response = Client().get('/api/openapi.json');"
+    "assert response.status_code == 200, response.status_code;"
+    "import sys;"
+    "print(','.join(m for m in ('jwt', 'cryptography') if m in sys.modules))"
+)
+
+
+def run(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+
+
+def import_breakdown(top):
+    """Return the `top` slowest top-level imports as (cumulative_us, module)."""
+    stderr = run(SETUP, "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only top-level entries (no indentation) are attributed once
+        if not name.startswith("  "):
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top], sum(cumulative for cumulative, _ in rows)
+
+
+def time_to_first_response(repeat):
+    """Wall time of a fresh interpreter serving its first request, in ms."""
+    samples = []
+    loaded = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loaded = run(FIRST_RESPONSE).stdout.strip()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=1500,
+                        help="Median time-to-first-response budget (default: 1500)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows, total = import_breakdown(args.top)
+    print(f"Top-level imports (total {total / 1000:.1f} ms):")
+    for cumulative, name in rows:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    samples, loaded = time_to_first_response(args.repeat)
+    median = statistics.median(samples)
+    print(f"\nTime to first response: median {median:.0f} ms, "
+          f"min {min(samples):.0f} ms, max {max(samples):.0f} ms")
+    print(f"JWT crypto modules loaded by first response: {loaded or 'none'}")
+
+    if median > args.budget_ms:
+        print(f"FAIL: over budget of {args.budget_ms:.0f} ms")
+        return 1
+    print(f"OK: within budget of {args.budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+UUIDv4 vs UUIDv7 primary key benchmark.
+
+Inserts the same number of rows into two scratch tables in the configured
+database, one keyed by random v4 UUIDs and one by time-ordered v7 UUIDs
+(base.ids.uuid7), and reports key generation cost, insert throughput and
+the size of each primary-key index. Run it against PostgreSQL for numbers
+that reflect production; the scratch tables are dropped afterwards.
+
+Usage (from `src/`):
+    python benchmarks/uuid_keys.py --rows 200000 --batch-size 1000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from base.ids import uuid7  # noqa: E402
+from base.models import Comment  # noqa: E402
+
+GENERATORS = {'v4': uuid.uuid4, 'v7': uuid7}
+
+
+def generate(generator, rows):
+    start = time.perf_counter()
+    keys = [generator() for _ in range(rows)]
+    return keys, (time.perf_counter() - start) * 1000
+
+
+def create_table(cursor, table):
+    id_type = Comment._meta.pk.db_type(connection)
+    cursor.execute(f'DROP TABLE IF EXISTS "{table}"')
+    cursor.execute(f'CREATE TABLE "{table}" (id {id_type} PRIMARY KEY, body varchar(200) NOT NULL)')
+
+
+def insert(table, keys, batch_size):
+    """Insert one row per key, one transaction per batch; returns rows per second."""
+    field = Comment._meta.pk
+    body = 'x' * 200
+    start = time.perf_counter()
+    for offset in range(0, len(keys), batch_size):
+        params = [(field.get_db_prep_value(key, connection), body)
+                  for key in keys[offset:offset + batch_size]]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO "{table}" (id, body) VALUES (%s, %s)', params)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def index_size(cursor, table):
+    """Size in bytes of the table's primary-key index, or None if the backend can't tell."""
+    if connection.vendor == 'postgresql':
+        cursor.execute(
+            "SELECT pg_relation_size(indexrelid) FROM pg_index "
+            "WHERE indrelid = %s::regclass AND indisprimary", [table])
+        return cursor.fetchone()[0]
+    if connection.vendor == 'sqlite':
+        try:
+            cursor.execute("SELECT sum(pgsize) FROM dbstat WHERE name = %s",
+                           [f"sqlite_autoindex_{table}_1"])
+        except Exception:
+            return None  # SQLite built without the dbstat table
+        return cursor.fetchone()[0]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Database: {connection.vendor}, {args.rows} rows in batches of {args.batch_size}")
+    print(f"{'key':<4} {'gen ms':>8} {'rows/s':>10} {'index KiB':>10} {'bytes/row':>10}")
+    for name, generator in GENERATORS.items():
+        table = f"bench_keys_{name}"
+        keys, gen_ms = generate(generator, args.rows)
+        with connection.cursor() as cursor:
+            create_table(cursor, table)
+        try:
+            rate = insert(table, keys, args.batch_size)
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(f'VACUUM ANALYZE "{table}"')
+                size = index_size(cursor, table)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS "{table}"')
+        size_text = f"{size / 1024:>10.0f} {size / args.rows:>10.1f}" if size else f"{'n/a':>10} {'n/a':>10}"
+        print(f"{name:<4} {gen_ms:>8.0f} {rate:>10.0f} {size_text}")
+
+
+if __name__ == '__main__':
+    main()
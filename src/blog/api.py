@@ -1,15 +1,71 @@
-from ninja_extra import NinjaExtraAPI
+from django.http import FileResponse
+from ninja_extra import NinjaExtraAPI, ControllerBase, api_controller, http_get
+from ninja_extra.permissions import IsAdminUser
 from ninja_jwt.authentication import JWTAuth
 from ninja_jwt.controller import NinjaJWTDefaultController
 from ninja.throttling import AnonRateThrottle, AuthRateThrottle
 
 from base.api import PostController, CommentController
+from base.schemas import ErrorSchema
+
+from . import profiling
 
 
 from ninja import Redoc
 
+
+class BlogAPI(NinjaExtraAPI):
+    """
+    NinjaExtraAPI that builds the OpenAPI schema on the first docs request
+    and reuses it afterwards instead of regenerating it on every request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._openapi_schema_cache = {}
+
+    def get_openapi_schema(self, *, path_prefix=None, path_params=None):
+        key = (path_prefix, tuple(sorted((path_params or {}).items())))
+        if key not in self._openapi_schema_cache:
+            self._openapi_schema_cache[key] = super().get_openapi_schema(
+                path_prefix=path_prefix, path_params=path_params)
+        return self._openapi_schema_cache[key]
+
+
+@api_controller('/profiles', permissions=[IsAdminUser])
+class ProfileController(ControllerBase):
+    """Staff-only access to request profiles captured with `X-Profile: 1`."""
+
+    @http_get('', response=list[dict])
+    def list_profiles(self):
+        """
+        List stored profiles, newest first.
+
+        Returns:
+            List[dict]: Summary of each profile (path, status, duration, query count and time).
+        """
+        return profiling.list_profiles()
+
+    @http_get('/{name}', response={200: None, 404: ErrorSchema})
+    def download_profile(self, name: str, kind: str = 'prof'):
+        """
+        Download a stored profile.
+
+        Args:
+            name: The profile ID (also returned in the `X-Profile-Id` response header).
+            kind: `prof` for the pstats file, `json` for the summary with every SQL query.
+
+        Returns:
+            The file as an attachment, or 404 if it does not exist.
+        """
+        path = profiling.profile_path(name, kind)
+        if path is None:
+            return 404, {"detail": "Profile not found."}
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=f"{name}.{kind}")
+
+
 # Ninja Blog API Definition
-api = NinjaExtraAPI(
+api = BlogAPI(
     title="Django Ninja Blog API",
     version="1.0.0",
     description="""
@@ -40,3 +96,4 @@ api = NinjaExtraAPI(
 api.register_controllers(NinjaJWTDefaultController)
 api.register_controllers(PostController)
 api.register_controllers(CommentController)
+api.register_controllers(ProfileController)
@@ -3,6 +3,10 @@ ASGI config for blog project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve through this application (e.g. with uvicorn or daphne) to enable the
+live comment stream at ``/api/comments/post/{post_id}/stream``; it relies on
+an event loop per worker to hold long-lived Server-Sent Events connections.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
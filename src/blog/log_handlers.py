@@ -0,0 +1,20 @@
+import os
+from logging.handlers import RotatingFileHandler
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler that opens its file, and creates the log directory,
+    on the first record instead of when logging is configured.
+
+    Keeps process start (every `manage.py` command, every cold start) free of
+    filesystem side effects.
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        kwargs['delay'] = True
+        super().__init__(filename, *args, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
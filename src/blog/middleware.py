@@ -0,0 +1,195 @@
+import hashlib
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from . import compression, profiling
+from .routers import use_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide per request whether ORM reads may use a read replica.
+
+    Only safe `/api/` requests read from replicas. After a successful write the
+    client receives a signed cookie that pins its reads to the primary for
+    `REPLICA_ROUTING['STICKY_SECONDS']`, so users always read their own writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.REPLICA_ROUTING
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _is_pinned(self, request):
+        try:
+            request.get_signed_cookie(
+                self.options['COOKIE_NAME'], max_age=self.options['STICKY_SECONDS'])
+            return True
+        except (KeyError, signing.BadSignature):
+            return False
+
+    def _replica_ok(self, request):
+        return (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in SAFE_METHODS
+            and request.path.startswith('/api/')
+            and not self._is_pinned(request)
+        )
+
+    def _pin_after_write(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_signed_cookie(
+                self.options['COOKIE_NAME'], '1',
+                max_age=self.options['STICKY_SECONDS'], httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = use_replica.set(self._replica_ok(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        return self._pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        token = use_replica.set(self._replica_ok(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        return self._pin_after_write(request, response)
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses with the best coding the client accepts.
+
+    Brotli, zstd and gzip are negotiated from `Accept-Encoding`. Bodies below
+    `COMPRESSION['MIN_SIZE']`, 304s and already-encoded responses are left
+    alone. Server-Sent Events are never compressed because buffering would
+    delay events. Streaming responses are compressed chunk by chunk. Compressed
+    bytes for regular responses are cached by body digest, so a body served
+    repeatedly (e.g. a cached page) is only compressed once.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.COMPRESSION
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if (
+            not request.path.startswith(self.options['PATH_PREFIX'])
+            or response.status_code == 304
+            or response.status_code < 200
+            or response.has_header('Content-Encoding')
+            or response.get('Content-Type', '').startswith('text/event-stream')
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.options['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        levels = self.options['LEVELS']
+        encoding = compression.negotiate(request.headers.get('Accept-Encoding', ''), levels)
+        if encoding is None:
+            return response
+        level = levels[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(
+                    encoding, level, response.streaming_content)
+            else:
+                response.streaming_content = compression.compress_stream(
+                    encoding, level, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = self._compress_cached(encoding, level, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The bytes now differ per coding, so a strong validator would be wrong
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_cached(self, encoding, level, content):
+        timeout = self.options['CACHE_TIMEOUT']
+        if not timeout:
+            return compression.compress(encoding, level, content)
+        cache = caches[self.options['CACHE_ALIAS']]
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        key = f"compressed:{encoding}:{level}:{digest}"
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compression.compress(encoding, level, content)
+            cache.set(key, compressed, timeout)
+        return compressed
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request on demand (see `blog.profiling`).
+
+    Untriggered requests only pay a header lookup, plus parsing the query
+    string when there is one. Under ASGI a triggered request is handled in
+    the thread-sensitive sync thread, so cProfile and the SQL capture see the
+    same thread that runs the (sync) view.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if profiling.is_triggered(request) and profiling.is_staff_request(request):
+            return profiling.profile_call(request, self.get_response)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if profiling.is_triggered(request):
+            return await sync_to_async(self._profile_in_thread)(request)
+        return await self.get_response(request)
+
+    def _profile_in_thread(self, request):
+        get_response = async_to_sync(self.get_response)
+        if not profiling.is_staff_request(request):
+            return get_response(request)
+        return profiling.profile_call(request, get_response)
@@ -0,0 +1,141 @@
+"""
+On-demand request profiling for staff users.
+
+A request is profiled when it carries `X-Profile: 1` (or `?_profile=1`) and
+its bearer token belongs to a staff user. The view runs under cProfile with
+every SQL statement recorded. The result is stored as a `.prof` file (pstats,
+e.g. for snakeviz) plus a `.json` summary in a bounded on-disk ring buffer.
+"""
+import cProfile
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+QUERY_FLAG = '_profile'
+NAME_RE = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+
+
+def is_triggered(request):
+    """Cheap check for the profiling flag: a header lookup, then the query string only if it has one."""
+    if request.META.get(PROFILE_HEADER) == '1':
+        return True
+    # Match the exact parameter, so `?x_profile=1` or `?q=_profile=10` don't trigger it
+    return bool(request.META.get('QUERY_STRING')) and request.GET.get(QUERY_FLAG) == '1'
+
+
+def is_staff_request(request):
+    """Authenticate the bearer token with JWTAuth and require a staff user."""
+    from ninja_jwt.authentication import JWTAuth
+
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return False
+    try:
+        user = JWTAuth().authenticate(request, token)
+    except Exception:
+        return False
+    return bool(user and user.is_active and user.is_staff)
+
+
+class QueryRecorder:
+    """Database execute wrapper that records each statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'database': context['connection'].alias,
+                'sql': sql,
+                'params': repr(params)[:500],
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+def profile_call(request, get_response):
+    """Run `get_response` under cProfile and SQL capture, then store the result."""
+    profiler = cProfile.Profile()
+    recorder = QueryRecorder()
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    name = store(profiler, {
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration_ms': round(duration_ms, 3),
+        'query_count': len(recorder.queries),
+        'query_ms': round(sum(q['duration_ms'] for q in recorder.queries), 3),
+        'queries': recorder.queries,
+    })
+    response['X-Profile-Id'] = name
+    return response
+
+
+def _directory():
+    directory = settings.PROFILING['DIR']
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def store(profiler, summary):
+    """Write a profile and its summary, dropping the oldest beyond `PROFILING['MAX_PROFILES']`."""
+    directory = _directory()
+    name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+    summary = {'id': name, 'created_at': time.time(), **summary}
+    with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+        json.dump(summary, f)
+
+    names = sorted(entry[:-5] for entry in os.listdir(directory) if entry.endswith('.json'))
+    for stale in names[:-settings.PROFILING['MAX_PROFILES']]:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, stale + suffix))
+            except FileNotFoundError:
+                pass
+    return name
+
+
+def list_profiles():
+    """Summaries of stored profiles, newest first, without the per-query detail."""
+    directory = _directory()
+    summaries = []
+    for entry in sorted(os.listdir(directory), reverse=True):
+        if not entry.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, entry)) as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue
+        summary.pop('queries', None)
+        summaries.append(summary)
+    return summaries
+
+
+def profile_path(name, kind):
+    """Path of a stored profile file, or None for unknown names or kinds."""
+    if kind not in ('prof', 'json') or not NAME_RE.match(name):
+        return None
+    path = os.path.join(_directory(), f"{name}.{kind}")
+    return path if os.path.exists(path) else None
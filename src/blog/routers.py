@@ -0,0 +1,65 @@
+import contextvars
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+# Initialize logger
+logger = logging.getLogger('BlogApi')
+
+# Set per request by ReplicaRoutingMiddleware; reads only leave the primary when True
+use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+class ReplicaRouter:
+    """
+    Send ORM reads to read replicas and everything else to the primary.
+
+    Reads go to a replica only when the current request opted in (safe API
+    requests that are not pinned to the primary after a recent write).
+    Replicas are picked round-robin and skipped while their last health check
+    failed; with no healthy replica, reads fall back to the primary.
+    """
+
+    def __init__(self):
+        self.replicas = list(settings.DATABASE_REPLICAS)
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._health = {}  # alias -> (healthy, checked_at)
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, alias):
+        interval = settings.REPLICA_ROUTING['HEALTH_CHECK_INTERVAL']
+        healthy, checked_at = self._health.get(alias, (True, 0.0))
+        now = time.monotonic()
+        if now - checked_at < interval:
+            return healthy
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+            healthy = True
+        except Exception as e:
+            logger.warning(f"Replica {alias} failed health check: {str(e)}")
+            connections[alias].close()
+            healthy = False
+        self._health[alias] = (healthy, now)
+        return healthy
+
+    def db_for_read(self, model, **hints):
+        if not self._cycle or not use_replica.get():
+            return 'default'
+        with self._lock:
+            candidates = [next(self._cycle) for _ in self.replicas]
+        for alias in candidates:
+            if self._is_healthy(alias):
+                return alias
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from any alias may relate
+        return True
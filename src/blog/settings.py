@@ -13,9 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 import datetime
 from pathlib import Path
-from decouple import config
-
-import logging.config
+from decouple import config, Csv
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -58,6 +56,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+
+    # Negotiated brotli/zstd/gzip for /api/ responses
+    "blog.middleware.CompressionMiddleware",
+
     "django.contrib.sessions.middleware.SessionMiddleware",
 
     # Corsheaders Middleware
@@ -66,8 +68,15 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+
+    # Route safe API reads to replicas, pinning to the primary after writes
+    "blog.middleware.ReplicaRoutingMiddleware",
+
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+
+    # Staff-only on-demand profiling (X-Profile: 1); innermost so it wraps the view
+    "blog.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "blog.urls"
@@ -119,6 +128,31 @@ if DATABASE_URL != "":
         )
     }
 
+# Read replicas: comma-separated database URLs, added as replica_0, replica_1, ...
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", cast=Csv(), default="")
+DATABASE_REPLICAS = []
+if DATABASE_REPLICA_URLS:
+    import dj_database_url
+for index, replica_url in enumerate(DATABASE_REPLICA_URLS):
+    alias = f"replica_{index}"
+    DATABASES[alias] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=300,
+        conn_health_checks=True,
+        test_options={"MIRROR": "default"},
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["blog.routers.ReplicaRouter"]
+
+REPLICA_ROUTING = {
+    # Reads stay on the primary this long after a client's own write
+    'STICKY_SECONDS': config("REPLICA_STICKY_SECONDS", cast=int, default=5),
+    # Seconds between health checks of each replica
+    'HEALTH_CHECK_INTERVAL': 10,
+    'COOKIE_NAME': 'db_pin',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -189,7 +223,8 @@ LOGGING = {
         },
         'file': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
+            # Creates logs/ and opens the file on first write, not at startup
+            'class': 'blog.log_handlers.LazyRotatingFileHandler',
             'filename': os.path.join(BASE_DIR, 'logs/BlogApi.log'),
             'maxBytes': 1024 * 1024 * 5,  # 5 MB
             'backupCount': 5,
@@ -209,13 +244,76 @@ LOGGING = {
     },
 }
 
-# Ensure the logs directory exists
-os.makedirs(os.path.join(BASE_DIR, 'logs'), exist_ok=True)
-
-# Apply the logging configuration
-logging.config.dictConfig(LOGGING)
+# LOGGING is applied once by django.setup(); nothing is configured at import time.
 
 NINJA_JWT = {
     'ACCESS_TOKEN_LIFETIME': datetime.timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': datetime.timedelta(days=7),
 }
+
+# Live comment streams (Server-Sent Events, ASGI only)
+# Use 'base.broadcast.PostgresBackend' to fan out across workers with LISTEN/NOTIFY.
+COMMENT_STREAM = {
+    'BACKEND': config("COMMENT_STREAM_BACKEND", cast=str, default="base.broadcast.LocalBackend"),
+    'MAX_CONNECTIONS': config("COMMENT_STREAM_MAX_CONNECTIONS", cast=int, default=1000),
+    'QUEUE_SIZE': config("COMMENT_STREAM_QUEUE_SIZE", cast=int, default=100),
+    'KEEPALIVE_SECONDS': 15,
+}
+
+# Background job queue (processed by `python manage.py run_workers`)
+JOB_QUEUE = {
+    'BATCH_SIZE': 10,
+    'POLL_INTERVAL_SECONDS': 1,
+    'MAX_ATTEMPTS': config("JOB_QUEUE_MAX_ATTEMPTS", cast=int, default=5),
+    'RETRY_BACKOFF_SECONDS': 10,
+    # Jobs still running after this long are assumed abandoned and re-claimed
+    'LEASE_SECONDS': 300,
+}
+
+# Comments removed per DELETE statement when purging a deleted post
+COMMENT_DELETE_BATCH_SIZE = config("COMMENT_DELETE_BATCH_SIZE", cast=int, default=5000)
+
+# Monthly comment partitions (`partition_comments`) and archival (`archive_comments`)
+COMMENT_PARTITIONING = {
+    'MONTHS_AHEAD': 3,
+    'ARCHIVE_AFTER_MONTHS': config("COMMENT_ARCHIVE_AFTER_MONTHS", cast=int, default=12),
+}
+
+# Response compression (blog.middleware.CompressionMiddleware)
+# brotli and zstd are used when the `brotli` / `zstandard` packages are installed.
+COMPRESSION = {
+    'PATH_PREFIX': '/api/',
+    # Responses smaller than this many bytes are sent uncompressed
+    'MIN_SIZE': config("COMPRESSION_MIN_SIZE", cast=int, default=1024),
+    # Compression level per coding; only codings listed here are offered
+    'LEVELS': {'br': 4, 'zstd': 3, 'gzip': 6},
+    # Seconds to cache compressed bodies by content digest (0 disables)
+    'CACHE_TIMEOUT': 300,
+    'CACHE_ALIAS': 'default',
+}
+
+# On-demand request profiling (blog.profiling), listed at /api/profiles
+PROFILING = {
+    'ENABLED': config("PROFILING_ENABLED", cast=bool, default=True),
+    'DIR': os.path.join(BASE_DIR, 'profiles'),
+    # Ring buffer size: the oldest profiles are deleted beyond this
+    'MAX_PROFILES': 50,
+}
+
+# Trending posts (`GET /api/posts/trending`, maintained by `update_trending`)
+TRENDING = {
+    # A comment's weight halves every HALF_LIFE_HOURS
+    'HALF_LIFE_HOURS': config("TRENDING_HALF_LIFE_HOURS", cast=float, default=6),
+    # Scores below this (about 1% of one fresh comment) are pruned on renormalization
+    'MIN_SCORE': 0.01,
+    'REBUILD_DAYS': 7,
+}
+
+# Serialized posts and comments for the batch endpoints (base.object_cache).
+# Set to a cache shared by all workers (Redis, Memcached) to enable; empty disables.
+OBJECT_CACHE = {
+    'CACHE_ALIAS': config("OBJECT_CACHE_ALIAS", default=''),
+    'TIMEOUT': 300,
+    # Most IDs accepted by one batch request
+    'MAX_BATCH_IDS': 200,
+}
@@ -0,0 +1,221 @@
+"""
+Tests for the project-level middleware: read-replica routing
+(blog.routers.ReplicaRouter with blog.middleware.ReplicaRoutingMiddleware)
+and response compression (blog.compression with
+blog.middleware.CompressionMiddleware).
+
+For the routing tests, two SQLite files stand in for the primary and
+`replica_0`. The replica alias is registered when this module is imported,
+before the test runner creates the test databases. Nothing replicates
+between the two files, so the database a query used shows in which rows
+it sees.
+
+Run from `src/`:
+    python manage.py test blog
+"""
+import atexit
+import copy
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from ninja_jwt.tokens import RefreshToken
+
+from base.models import Post
+
+from . import compression, profiling
+from .middleware import CompressionMiddleware
+from .routers import ReplicaRouter
+
+REPLICA = 'replica_0'
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPLICA not in connections.settings:
+    _test_dir = tempfile.mkdtemp(prefix='blog-replica-tests-')
+    atexit.register(shutil.rmtree, _test_dir, ignore_errors=True)
+    primary = connections.settings['default']
+    replica = copy.deepcopy(primary)
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        replica['TEST']['NAME'] = os.path.join(_test_dir, 'replica.sqlite3')
+    else:
+        replica['TEST']['NAME'] = f"test_{primary['NAME']}_replica"
+    connections.settings[REPLICA] = replica
+    if primary['ENGINE'] == 'django.db.backends.sqlite3':
+        primary['TEST']['NAME'] = os.path.join(_test_dir, 'primary.sqlite3')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpTestData(cls):
+        # Users exist on both sides, as they would on a real replica
+        User = get_user_model()
+        cls.user = User.objects.db_manager('default').create_user(username='reader', password='x')
+        User.objects.db_manager(REPLICA).create(
+            id=cls.user.id, username=cls.user.username, password=cls.user.password)
+        cls.primary_post = Post.objects.db_manager('default').create(
+            title='primary', content='p', author=cls.user)
+        Post.objects.db_manager(REPLICA).create(title='replica', content='r', author_id=cls.user.id)
+
+    def setUp(self):
+        # The router reads DATABASE_REPLICAS when it is created, so build one for this test
+        patcher = mock.patch.dict(router.__dict__, {'routers': [ReplicaRouter()]})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        token = RefreshToken.for_user(self.user).access_token
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return sorted(post['title'] for post in response.json()['items'])
+
+    def test_unpinned_get_reads_from_replica(self):
+        response = self.client.get('/api/posts', headers=self.headers)
+        self.assertEqual(self.titles(response), ['replica'])
+
+    def test_write_goes_to_primary(self):
+        response = self.client.post(
+            '/api/posts', {'title': 'new', 'content': 'n'},
+            content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Post.objects.using('default').filter(title='new').exists())
+        self.assertFalse(Post.objects.using(REPLICA).filter(title='new').exists())
+        self.assertIn('db_pin', response.cookies)
+
+    def test_pinned_client_reads_from_primary(self):
+        self.client.post(
+            '/api/posts', {'title': 'new', 'content': 'n'},
+            content_type='application/json', headers=self.headers)
+        self.assertIn('db_pin', self.client.cookies)
+        response = self.client.get('/api/posts', headers=self.headers)
+        self.assertEqual(self.titles(response), ['new', 'primary'])
+
+    def test_batch_cache_fills_from_primary(self):
+        # The replica has not caught up with the primary's post yet
+        self.addCleanup(cache.clear)
+        with override_settings(OBJECT_CACHE={**settings.OBJECT_CACHE, 'CACHE_ALIAS': 'default'}):
+            response = self.client.get(
+                f'/api/posts/batch?ids={self.primary_post.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post['title'] for post in response.json()['items']], ['primary'])
+
+
+class ReplicaSettingsTests(SimpleTestCase):
+    def test_replica_urls_with_default_sqlite_primary(self):
+        # Settings are read once per process, so load them in a fresh interpreter
+        env = {**os.environ, 'DATABASE_URL': '',
+               'DATABASE_REPLICA_URLS': f"sqlite:///{os.path.join(tempfile.gettempdir(), 'replica.sqlite3')}"}
+        code = (
+            "import django; django.setup();"
+            "from django.conf import settings;"
+            "print(settings.DATABASES['default']['ENGINE'], *settings.DATABASE_REPLICAS,"
+            " settings.DATABASES['replica_0']['ENGINE'])"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), [
+            'django.db.backends.sqlite3', REPLICA, 'django.db.backends.sqlite3'])
+
+
+class NegotiateTests(SimpleTestCase):
+    allowed = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+    def test_highest_q_value_wins(self):
+        self.assertEqual(compression.negotiate('gzip;q=1.0, br;q=0.5', self.allowed), 'gzip')
+
+    def test_server_preference_breaks_ties(self):
+        self.assertEqual(compression.negotiate('gzip, br', self.allowed), 'br')
+
+    def test_q_zero_refuses_a_coding(self):
+        self.assertIsNone(compression.negotiate('gzip;q=0', {'gzip': 6}))
+        self.assertEqual(compression.negotiate('*, gzip;q=0', {'gzip': 6, 'zstd': 3}), 'zstd')
+
+    def test_wildcard_accepts_any_allowed_coding(self):
+        self.assertEqual(compression.negotiate('*', {'gzip': 6}), 'gzip')
+        self.assertIsNone(compression.negotiate('*;q=0', {'gzip': 6}))
+
+    def test_identity_only_means_no_compression(self):
+        self.assertIsNone(compression.negotiate('identity', self.allowed))
+        self.assertIsNone(compression.negotiate('', self.allowed))
+
+    def test_codings_outside_the_allowed_set_are_not_used(self):
+        self.assertIsNone(compression.negotiate('br', {'gzip': 6}))
+
+
+@override_settings(COMPRESSION={**settings.COMPRESSION, 'MIN_SIZE': 100, 'CACHE_TIMEOUT': 0})
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"title": "post"}' * 100
+
+    def process(self, response, accept_encoding='gzip'):
+        request = RequestFactory().get('/api/posts', headers={'Accept-Encoding': accept_encoding})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compresses_large_bodies(self):
+        response = self.process(HttpResponse(self.body, headers={'ETag': '"v1"'}))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skips_not_modified(self):
+        response = self.process(HttpResponseNotModified())
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_skips_small_bodies(self):
+        response = self.process(HttpResponse(b'{}'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, b'{}')
+
+    def test_skips_server_sent_events(self):
+        events = [b'data: 1\n\n', b'data: 2\n\n']
+        response = self.process(StreamingHttpResponse(iter(events), content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(list(response.streaming_content), events)
+
+    def test_streams_compressed_chunks(self):
+        chunks = [self.body[n:n + 300] for n in range(0, len(self.body), 300)]
+        response = self.process(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        compressed = list(response.streaming_content)
+        # Each chunk is flushed as it arrives rather than buffered to the end
+        self.assertGreaterEqual(len(compressed), len(chunks))
+        self.assertEqual(gzip.decompress(b''.join(compressed)), self.body)
+
+    async def test_streams_async_chunks(self):
+        async def chunks():
+            for n in range(0, len(self.body), 300):
+                yield self.body[n:n + 300]
+
+        response = self.process(StreamingHttpResponse(chunks()))
+        compressed = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(gzip.decompress(b''.join(compressed)), self.body)
+
+
+class ProfilingTriggerTests(SimpleTestCase):
+    def triggered(self, path, **headers):
+        return profiling.is_triggered(RequestFactory().get(path, headers=headers))
+
+    def test_header_or_exact_query_flag_triggers(self):
+        self.assertTrue(self.triggered('/api/posts', x_profile='1'))
+        self.assertTrue(self.triggered('/api/posts?limit=5&_profile=1'))
+
+    def test_similar_query_parameters_do_not_trigger(self):
+        self.assertFalse(self.triggered('/api/posts'))
+        self.assertFalse(self.triggered('/api/posts?x_profile=1'))
+        self.assertFalse(self.triggered('/api/posts?_profile=10'))
+        self.assertFalse(self.triggered('/api/posts?q=_profile=1'))